@@ -0,0 +1,44 @@
+"""
+Mede o tempo de carregamento da sequencia de explosão com e sem o cache de imagens decodificadas.
+Deve ser executado a partir da raiz do projeto:
+python -m benchmarks.asset_cache_benchmark
+"""
+
+import os
+import shutil
+import tempfile
+import time
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import pygame
+from engine.core.objects import ImageLoader
+
+FRAME_COUNT = 64
+
+def load_explosion(cache_directory: str) -> float:
+    """
+    Carrega a sequencia de explosão completa e retorna o tempo gasto até ela poder ser usada
+    """
+    start = time.perf_counter()
+    img_loader = ImageLoader()
+    img_loader.set_decoded_image_cache(cache_directory)
+    image_names = img_loader.find_images('explosion/explosion*.png')
+    img_loader.load_sprite_sequence(image_names, 'explosion')
+    img_loader.get_sprite_sequence('explosion')
+    img_loader.load_baked_sprite_sequence(image_names, 'baked_explosion', frame_count=FRAME_COUNT)
+    img_loader.get_sprite_sequence('baked_explosion')
+    return time.perf_counter() - start
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((1400, 850))
+    cache_directory = tempfile.mkdtemp(prefix='asset_cache_')
+    try:
+        print("sem cache       | {:8.1f} ms".format(1000*load_explosion(None)))
+        print("cache vazio     | {:8.1f} ms".format(1000*load_explosion(cache_directory)))
+        print("cache preenchido| {:8.1f} ms".format(1000*load_explosion(cache_directory)))
+    finally:
+        shutil.rmtree(cache_directory)
+
+if __name__ == '__main__':
+    main()
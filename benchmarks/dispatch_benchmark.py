@@ -0,0 +1,66 @@
+"""
+Compara o custo de escolher a função da fase estreita para cada par de colisores:
+o registro por par de classes do PhysicManager contra a antiga cadeia de issubclass.
+As duas versões chamam as mesmas funções vazias, então apenas o custo da escolha é medido.
+Deve ser executado a partir da raiz do projeto:
+python -m benchmarks.dispatch_benchmark
+"""
+
+import os
+import random
+import time
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+from engine.core.physics import CircleCollider, RectCollider, PhysicManager
+
+COLLIDER_COUNTS = (100, 200, 400)
+PASSES = 20
+
+def process_circle_intersection(collider_a, collider_b):
+    pass
+
+def process_rect_circle_intersection(rect_collider, circle_collider):
+    pass
+
+def process_intersection_with_issubclass_chain(collider_a, collider_b):
+    """
+    Cópia da escolha feita pelo process_intersection antes do registro
+    """
+    if issubclass(type(collider_a), CircleCollider) and issubclass(type(collider_b), CircleCollider):
+        process_circle_intersection(collider_a, collider_b)
+    elif (issubclass(type(collider_a), CircleCollider) and issubclass(type(collider_b), RectCollider)):
+        process_rect_circle_intersection(collider_b, collider_a)
+    elif (issubclass(type(collider_a), RectCollider) and issubclass(type(collider_b), CircleCollider)):
+        process_rect_circle_intersection(collider_a, collider_b)
+
+def create_pairs(collider_count: int):
+    """
+    Cria todos os pares entre circulos e retangulos (um retangulo para cada três circulos)
+    """
+    random.seed(0)
+    colliders = [RectCollider() if random.random() < 0.25 else CircleCollider() for _ in range(collider_count)]
+    return [(colliders[i], colliders[j]) for i in range(collider_count) for j in range(i+1, collider_count)]
+
+def time_dispatch(process_intersection, pairs) -> float:
+    """
+    Retorna o tempo médio de uma passada por todos os pares
+    """
+    start = time.perf_counter()
+    for _ in range(PASSES):
+        for collider_a, collider_b in pairs:
+            process_intersection(collider_a, collider_b)
+    return (time.perf_counter() - start)/PASSES
+
+def main():
+    physic_manager = PhysicManager()
+    physic_manager.register_collision_handler(CircleCollider, CircleCollider, process_circle_intersection)
+    physic_manager.register_collision_handler(RectCollider, CircleCollider, process_rect_circle_intersection)
+    for collider_count in COLLIDER_COUNTS:
+        pairs = create_pairs(collider_count)
+        chain_time = time_dispatch(process_intersection_with_issubclass_chain, pairs)
+        registry_time = time_dispatch(physic_manager.process_intersection, pairs)
+        print("{:>4} colliders ({:>5} pairs) | issubclass chain {:8.3f} ms | registry {:8.3f} ms | {:4.2f}x".format(
+        collider_count, len(pairs), 1000*chain_time, 1000*registry_time, chain_time/registry_time))
+
+if __name__ == '__main__':
+    main()
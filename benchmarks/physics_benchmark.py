@@ -0,0 +1,72 @@
+"""
+Mede o custo do passo de física com muitos colisores.
+Deve ser executado a partir da raiz do projeto:
+python -m benchmarks.physics_benchmark
+"""
+
+import os
+import random
+import time
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+from pygame.math import Vector2
+import engine
+from engine.core.application import Application
+from engine.core.objects import Rigidbody
+from engine.core.physics import CircleCollider, AllPairsBroadPhase, SpatialHashBroadPhase, SweepAndPruneBroadPhase, np
+
+COLLIDER_COUNTS = (100, 200, 400)
+STEPS = 60
+
+def create_scene(app: Application, collider_count: int):
+    """
+    Cria colisores circulares espalhados pela tela, parecidos com os asteroides do jogo
+    """
+    random.seed(0)
+    width = app.get_display().get_width()
+    height = app.get_display().get_height()
+    game_objects = list()
+    for _ in range(collider_count):
+        game_object = app.add_game_object()
+        game_object.get_transform().position = Vector2(random.uniform(0, width), random.uniform(0, height))
+        rigid_body = game_object.add_component(Rigidbody)
+        rigid_body.velocity = Vector2(random.uniform(-3, 3), random.uniform(-3, 3))
+        rigid_body.mass = random.uniform(1, 6)
+        collider = game_object.add_component(CircleCollider)
+        collider.radius = random.uniform(0.2, 2)*app.get_meter()
+        game_objects.append(game_object)
+    return game_objects
+
+def run_steps(app: Application, game_objects, steps: int) -> float:
+    """
+    Executa os frames lógicos e retorna o tempo gasto apenas no passo de física
+    """
+    physic_time = 0.0
+    for _ in range(steps):
+        for game_object in game_objects:
+            game_object.update()
+        start = time.perf_counter()
+        app.get_physic_manager().physic_step()
+        physic_time += time.perf_counter() - start
+    return physic_time
+
+def main():
+    configurations = [
+        ('all pairs', AllPairsBroadPhase, False),
+        ('spatial hash', SpatialHashBroadPhase, False),
+        ('sweep and prune', SweepAndPruneBroadPhase, False),
+    ]
+    if np is not None:
+        configurations.append(('sap + vectorized', SweepAndPruneBroadPhase, True))
+    for collider_count in COLLIDER_COUNTS:
+        for name, broad_phase_constructor, vectorized in configurations:
+            app = Application()
+            engine.core.utilities.application_reference = app
+            app.get_physic_manager().set_broad_phase(broad_phase_constructor())
+            app.get_physic_manager().set_vectorized_circle_collisions(vectorized)
+            game_objects = create_scene(app, collider_count)
+            elapsed = run_steps(app, game_objects, STEPS)
+            print("{:>4} colliders | {:<16} | {:8.3f} ms/step".format(collider_count, name, 1000*elapsed/STEPS))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Mede o custo de adicionar e remover muitos GameObjects da aplicação.
+Com o registro indexado por id o tempo por objeto deve se manter constante ao aumentar a quantidade.
+Deve ser executado a partir da raiz do projeto:
+python -m benchmarks.registry_benchmark
+"""
+
+import os
+import random
+import time
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import engine
+from engine.core.application import Application
+
+OBJECT_COUNTS = (1000, 2500, 5000, 10000)
+
+def add_and_remove(app: Application, object_count: int):
+    """
+    Adiciona os objetos, espalha alguns pelas sorting layers e remove todos em ordem aleatoria.
+    Retorna o tempo gasto em cada etapa
+    """
+    random.seed(0)
+    start = time.perf_counter()
+    game_objects = [app.add_game_object() for _ in range(object_count)]
+    for game_object in game_objects[::4]:
+        game_object.set_sorting_layer_index(random.randint(1, 5))
+    add_time = time.perf_counter() - start
+
+    random.shuffle(game_objects)
+    start = time.perf_counter()
+    for i, game_object in enumerate(game_objects):
+        if i % 2 == 0:
+            app.remove_game_object(game_object)
+        else:
+            app.remove_game_object_by_id(game_object.get_id())
+    remove_time = time.perf_counter() - start
+    return add_time, remove_time
+
+def main():
+    for object_count in OBJECT_COUNTS:
+        app = Application()
+        engine.core.utilities.application_reference = app
+        add_time, remove_time = add_and_remove(app, object_count)
+        print("{:>6} objects | add {:8.2f} ms ({:6.2f} us/object) | remove {:8.2f} ms ({:6.2f} us/object)".format(
+        object_count, 1000*add_time, 1e6*add_time/object_count, 1000*remove_time, 1e6*remove_time/object_count))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Mede o custo da integração dos corpos rigidos (arrasto e movimento) por frame lógico.
+Deve ser executado a partir da raiz do projeto:
+python -m benchmarks.rigidbody_benchmark
+"""
+
+import os
+import random
+import time
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+from pygame.math import Vector2
+import engine
+from engine.core.application import Application
+from engine.core.objects import Rigidbody
+
+BODY_COUNTS = (100, 1000, 5000)
+STEPS = 120
+
+def create_bodies(app: Application, body_count: int):
+    """
+    Cria corpos rigidos com velocidade, rotação e arrasto, como os asteroides e projéteis do jogo
+    """
+    random.seed(0)
+    rigid_bodies = list()
+    for _ in range(body_count):
+        game_object = app.add_game_object()
+        game_object.get_transform().position = Vector2(random.uniform(0, 1400), random.uniform(0, 800))
+        rigid_body = game_object.add_component(Rigidbody)
+        rigid_body.velocity = Vector2(random.uniform(-3, 3), random.uniform(-3, 3))
+        rigid_body.angular_velocity = random.uniform(-0.05, 0.05)
+        rigid_body.linear_drag = random.choice((0.0, 0.01))
+        rigid_body.angular_drag = random.choice((0.0, 0.01))
+        rigid_bodies.append(rigid_body)
+    return rigid_bodies
+
+def main():
+    for body_count in BODY_COUNTS:
+        app = Application()
+        engine.core.utilities.application_reference = app
+        rigid_bodies = create_bodies(app, body_count)
+        start = time.perf_counter()
+        for _ in range(STEPS):
+            for rigid_body in rigid_bodies:
+                rigid_body.update()
+        elapsed = time.perf_counter() - start
+        print("{:>5} bodies | {:7.3f} ms/step".format(body_count, 1000*elapsed/STEPS))
+
+if __name__ == '__main__':
+    main()
@@ -3,12 +3,14 @@ Esse módulo contem a classe que representa a aplicação
 é o objeto que contem todos os objetos da aplicação
 """
 
-from typing import List, Dict, Callable, Any
+from typing import List, Dict, Callable, Any, Tuple
 import time
 import pygame
 from pygame.math import Vector2
-from engine.core.objects import GameObject, ImageLoader, Object, SoundManager, TextRenderer
-from engine.core.physics import PhysicManager
+from engine.core.commands import CommandBuffer
+from engine.core.ecs import World
+from engine.core.objects import GameObject, ImageLoader, Object, SoundManager, TextRenderer, RotationCache, FontRegistry
+from engine.core.physics import Collider, PhysicManager
 
 class EventSystem(Object):
 
@@ -135,27 +137,54 @@ class Application(Object):
         pygame.mixer.init()
         pygame.init()
         pygame.font.init()
-        self.__game_objects = list()
+        #Os GameObjects ficam em uma lista densa e o indice de cada um é guardado por id,
+        #então a remoção é feita em tempo constante movendo o último objeto para o lugar do removido
+        self.__game_objects: List[GameObject] = list()
+        self.__game_object_indices: Dict[int, int] = dict()
+        self.__iteration_depth = 0
+        self.__pending_removals: Dict[int, GameObject] = dict()
+        self.__command_buffer = CommandBuffer(self)
         self.__application_display = pygame.display.set_mode((1400,850))
+        self.__display_width = self.__application_display.get_width()
+        self.__display_height = self.__application_display.get_height()
         self.__run_game = True
         self.__event_system = EventSystem()
         self.__keyboard = KeyboardManager()
         self.__img_loader = ImageLoader()
+        self.__rotation_cache = RotationCache()
+        self.__font_registry = FontRegistry()
         self.__mouse = MouseManager()
         self.__physic = PhysicManager()
+        self.__world = None
         self.__sound_manager = SoundManager()
         self.__logic_frame_rate = 60.0
         self.__logic_frame_duration = 1/self.__logic_frame_rate
-        self.__logic_frame_duration_ns = self.__logic_frame_duration*1e9
-        self.__last_update_timestamp = 0.0
+        self.__logic_frame_duration_ns = int(self.__logic_frame_duration*1e9)
+        self.__last_loop_timestamp_ns = None
+        self.__accumulator_ns = 0
+        self.__max_catch_up_steps = 5
+        self.__idle_strategy = 'sleep'
+        self.__render_frame_duration_ns = 0
+        self.__last_draw_timestamp_ns = 0
+        self.__dirty_rect_mode = False
+        self.__background_surface = None
+        self.__drawn_rects: List[pygame.Rect] = list()
+        self.__restored_rects: List[pygame.Rect] = list()
+        self.__full_redraw = True
+        self.__paused_in_last_draw = False
+        self.__render_queue: List[Tuple[pygame.Surface, Any]] = list()
+        self.__culling_enabled = True
+        self.__culling_margin = 32
+        self.__culled_render_count = 0
+        self.__drawn_render_count = 0
         self.__pause_game = False
         self.__current_frame = 0
         self.__queued_methods = list()
-        self.__sorting_layers: List[List[GameObject]] = list()
+        self.__sorting_layers: List[Dict[int, GameObject]] = list()
         
       
         for i in range(32):
-            self.__sorting_layers.append(list())
+            self.__sorting_layers.append(dict())
 
         self.__meter = self.__application_display.get_size()[0]/100
         self.__render_interpolation = 0.0
@@ -173,41 +202,103 @@ class Application(Object):
         """
         game_object = GameObject()
         game_object.set_application(self)
+        if self.__world is not None:
+            self.__world.register_game_object(game_object)
+        self.__game_object_indices[game_object.get_id()] = len(self.__game_objects)
         self.__game_objects.append(game_object)
-        self.__sorting_layers[0].append(game_object)
+        self.__sorting_layers[0][game_object.get_id()] = game_object
         return game_object
     
     def get_game_object_by_id(self, id):
         """
         Retorna um game object por id
         """
-        for gm in self.__game_objects:
-            if gm.get_id() == id:
-                return gm
+        index = self.__game_object_indices.get(id)
+        if index is None or id in self.__pending_removals:
+            return None
+        return self.__game_objects[index]
+
+    def get_game_object_count(self) -> int:
+        """
+        Retorna o número de GameObjects da aplicação
+        """
+        return len(self.__game_objects) - len(self.__pending_removals)
     
     def remove_game_object_by_id(self, id):
         """
         Remove um game object por id
         """
-        self.remove_game_object(self.get_game_object_by_id(id))
+        game_object = self.get_game_object_by_id(id)
+        if game_object is not None:
+            self.remove_game_object(game_object)
 
     def remove_game_object(self, game_object: GameObject):
         """
-        Delete um game_object especifico
+        Delete um game_object especifico.
+        Enquanto os GameObjects ou os colisores estão sendo percorridos (update, física, async_update e draw)
+        o objeto é desativado, os seus colisores saem do PhysicManager e a remoção
+        é registrada no buffer de comandos
         """
-        try:
-            self.__sorting_layers[game_object.get_sorting_layer_index()].remove(game_object)
-        except:
-            pass
-        try:
-            self.__game_objects.remove(game_object)
-        except:
-            pass
+        game_object_id = game_object.get_id()
+        if game_object_id not in self.__game_object_indices:
+            return
+        if self.__iteration_depth > 0:
+            if game_object_id not in self.__pending_removals:
+                game_object.set_state(False)
+                #Os colisores saem na hora para que o objeto não receba outras colisões neste passo
+                for component in game_object.get_components():
+                    if isinstance(component, Collider):
+                        self.__physic.remove_collider(component)
+                self.__pending_removals[game_object_id] = game_object
+                self.__command_buffer.destroy(game_object)
+            return
+        self.__pending_removals.pop(game_object_id, None)
+        self.__remove_game_object_now(game_object)
+
+    def __remove_game_object_now(self, game_object: GameObject):
+        """
+        Remove o objeto das estruturas da aplicação e destrói os seus componentes
+        """
+        game_object_id = game_object.get_id()
+        index = self.__game_object_indices.pop(game_object_id)
+        last_game_object = self.__game_objects.pop()
+        if last_game_object is not game_object:
+            self.__game_objects[index] = last_game_object
+            self.__game_object_indices[last_game_object.get_id()] = index
+        self.__sorting_layers[game_object.get_sorting_layer_index()].pop(game_object_id, None)
         try:
             game_object.destroy()
         except:
             pass
-        del game_object
+
+    def __begin_iteration(self):
+        """
+        Marca o inicio de um trecho que percorre os GameObjects ou os colisores, durante o qual
+        as alterações estruturais devem ser registradas no buffer de comandos
+        """
+        self.__iteration_depth += 1
+
+    def __end_iteration(self):
+        """
+        Marca o fim de um trecho que percorre os GameObjects ou os colisores.
+        Ao sair do trecho mais externo o buffer de comandos é aplicado (ponto de sincronização)
+        """
+        self.__iteration_depth -= 1
+        if self.__iteration_depth == 0:
+            self.__command_buffer.apply()
+
+    def is_iterating(self) -> bool:
+        """
+        Retorna verdadeiro se os GameObjects ou os colisores estão sendo percorridos.
+        Nesse caso alterações estruturais devem ser feitas pelo buffer de comandos
+        """
+        return self.__iteration_depth > 0
+
+    def get_command_buffer(self) -> CommandBuffer:
+        """
+        Retorna o buffer de comandos, aplicado nos pontos de sincronização do frame
+        """
+        return self.__command_buffer
 
     def change_game_object_sorting_layer(self, game_object: GameObject, target_layer: int) -> int:
         """
@@ -217,11 +308,8 @@ class Application(Object):
         if current_layer == target_layer:
             return current_layer
 
-        for i,sorting_layer in enumerate(self.__sorting_layers):
-            if i == target_layer:
-                sorting_layer.append(game_object)
-            if i == current_layer:
-                sorting_layer.remove(game_object)
+        self.__sorting_layers[current_layer].pop(game_object.get_id(), None)
+        self.__sorting_layers[target_layer][game_object.get_id()] = game_object
 
         return target_layer
 
@@ -255,6 +343,18 @@ class Application(Object):
         """
         return self.__img_loader
 
+    def get_rotation_cache(self) -> RotationCache:
+        """
+        Retorna o cache de superficies rotacionadas compartilhado pelos renderizadores
+        """
+        return self.__rotation_cache
+
+    def get_font_registry(self) -> FontRegistry:
+        """
+        Retorna o registro de fontes e glifos compartilhado pelos textos
+        """
+        return self.__font_registry
+
     def get_sound_manager(self) -> SoundManager:
         """
         Retorna o sistema responsavel pelos sons do jogo
@@ -267,6 +367,89 @@ class Application(Object):
         """
         return self.__application_display
 
+    def set_dirty_rect_mode(self, enabled: bool):
+        """
+        Ativa ou desativa a renderização por retangulos sujos.
+        Nesse modo apenas as regiões desenhadas no frame anterior e no frame atual são
+        restauradas a partir do plano de fundo e enviadas para a tela
+        """
+        self.__dirty_rect_mode = enabled
+        self.__full_redraw = True
+
+    def get_dirty_rect_mode(self) -> bool:
+        """
+        Retorna se a renderização por retangulos sujos esta ativa
+        """
+        return self.__dirty_rect_mode
+
+    def set_background_surface(self, surface: pygame.Surface):
+        """
+        Define a superficie usada para restaurar o plano de fundo no modo de retangulos sujos
+        """
+        self.__background_surface = surface
+        self.__full_redraw = True
+
+    def mark_dirty_rect(self, rect: pygame.Rect):
+        """
+        Informa a região da tela que foi desenhada diretamente por um componente neste frame.
+        Superficies enviadas por submit_blit são registradas automaticamente
+        """
+        if self.__dirty_rect_mode:
+            self.__drawn_rects.append(rect)
+
+    def set_culling(self, enabled: bool, margin: float = 32):
+        """
+        Ativa ou desativa o descarte de componentes gráficos que estão fora da tela.
+        margin (em pixels) amplia a tela para cobrir a interpolação de objetos rapidos
+        """
+        self.__culling_enabled = enabled
+        self.__culling_margin = margin
+
+    def cull_render_component(self, component: "RenderComponent") -> bool:
+        """
+        Retorna verdadeiro se o componente esta completamente fora da tela e não deve ser desenhado
+        """
+        if self.__culling_enabled:
+            bounds = component.get_screen_bounds()
+            if bounds is not None:
+                margin = self.__culling_margin
+                if (bounds[2] < -margin or bounds[3] < -margin or
+                bounds[0] > self.__display_width + margin or bounds[1] > self.__display_height + margin):
+                    self.__culled_render_count += 1
+                    return True
+        self.__drawn_render_count += 1
+        return False
+
+    def get_culled_render_count(self) -> int:
+        """
+        Retorna quantos componentes gráficos foram descartados por estarem fora da tela no último frame
+        """
+        return self.__culled_render_count
+
+    def get_drawn_render_count(self) -> int:
+        """
+        Retorna quantos componentes gráficos foram desenhados no último frame
+        """
+        return self.__drawn_render_count
+
+    def submit_blit(self, surface: pygame.Surface, position):
+        """
+        Adiciona uma superficie à fila de renderização.
+        A fila é desenhada com uma única chamada a Surface.blits ao final de cada sorting layer
+        """
+        self.__render_queue.append((surface, position))
+
+    def flush_render_queue(self):
+        """
+        Desenha todas as superficies da fila de renderização de uma vez
+        """
+        if not self.__render_queue:
+            return
+        rects = self.__application_display.blits(self.__render_queue, self.__dirty_rect_mode)
+        if self.__dirty_rect_mode:
+            self.__drawn_rects.extend(rects)
+        self.__render_queue.clear()
+
     def get_render_interpolation(self):
         """
         Retorna a interpolação atual que foi calculada
@@ -285,12 +468,62 @@ class Application(Object):
         """
         return self.__logic_frame_rate
 
+    def get_current_frame(self) -> int:
+        """
+        Retorna o número de frames lógicos executados desde o início da aplicação.
+        O contador não avança enquanto o jogo esta pausado
+        """
+        return self.__current_frame
+
+    def set_max_catch_up_steps(self, steps: int):
+        """
+        Define quantos frames lógicos podem ser executados em uma única volta do loop principal
+        para recuperar o atraso quando a renderização estiver lenta.
+        O tempo que exceder esse limite é descartado e o jogo desacelera em vez de travar
+        """
+        self.__max_catch_up_steps = max(1, steps)
+
+    def set_idle_strategy(self, strategy: str):
+        """
+        Define o que o loop principal faz enquanto espera o próximo frame:
+        'busy' executa o loop sem parar, 'yield' libera o processador a cada volta
+        e 'sleep' dorme até o próximo frame lógico ou de renderização
+        """
+        if strategy not in ('busy', 'yield', 'sleep'):
+            raise Exception("Estratégia de espera {} não é valida".format(strategy))
+        self.__idle_strategy = strategy
+
+    def set_max_render_frame_rate(self, frame_rate: float):
+        """
+        Limita o número de frames renderizados por segundo.
+        None remove o limite, e com a estratégia 'sleep' a renderização acompanha os frames lógicos
+        """
+        self.__render_frame_duration_ns = 0 if frame_rate is None else int(1e9/frame_rate)
+
     def get_physic_manager(self):
         """
         Retorna o sistema responsavel pela fisica
         """
         return self.__physic
 
+    def enable_ecs(self) -> World:
+        """
+        Ativa a camada ECS. Todos os GameObjects passam a ser espelhados em entidades do World,
+        que pode ser consultado por classes de componentes, e os sistemas registrados nele
+        são executados a cada frame lógico, após o update dos GameObjects
+        """
+        if self.__world is None:
+            self.__world = World()
+            for game_object in self.__game_objects:
+                self.__world.register_game_object(game_object)
+        return self.__world
+
+    def get_world(self) -> World:
+        """
+        Retorna o World da camada ECS, ou None se ela não estiver ativa
+        """
+        return self.__world
+
     def enqueue_method(self, method, frames):
         """
         Armazena um método para ser executado após o número especificado de frames
@@ -301,24 +534,57 @@ class Application(Object):
         """
         Executa os métodos armazenados
         """
-        for queued_method in self.__queued_methods:
+        #A lista é reconstruida para que métodos executados possam agendar outros sem alterar a iteração
+        queued_methods = self.__queued_methods
+        self.__queued_methods = list()
+        for queued_method in queued_methods:
             if self.__current_frame - queued_method[1] >= queued_method[2]:
                 queued_method[0]()
-                self.__queued_methods.remove(queued_method)
+            else:
+                self.__queued_methods.append(queued_method)
 
     def __update(self):
+        """
+        Acumula o tempo decorrido e executa quantos frames lógicos de duração fixa couberem nele
+        """
+        now = time.perf_counter_ns()
+        if self.__last_loop_timestamp_ns is None:
+            self.__last_loop_timestamp_ns = now
+        self.__accumulator_ns += now - self.__last_loop_timestamp_ns
+        self.__last_loop_timestamp_ns = now
+
+        if self.__pause_game:
+            self.__accumulator_ns = 0
+            return
+
+        steps = 0
+        while self.__accumulator_ns >= self.__logic_frame_duration_ns and steps < self.__max_catch_up_steps:
+            self.__logic_step()
+            self.__accumulator_ns -= self.__logic_frame_duration_ns
+            steps += 1
+
+        if self.__accumulator_ns >= self.__logic_frame_duration_ns:
+            self.__accumulator_ns %= self.__logic_frame_duration_ns
+
+    def __logic_step(self):
         """
         Executa o método update de todos os GameObjects registrados
         """
-        if time.time() - self.__last_update_timestamp >= self.__logic_frame_duration and not self.__pause_game:
-            self.__current_frame += 1
-            self.__last_update_timestamp = time.time()
-            self.__event_system.fire_event_one_shot("LogicFrameStart")
-            self.execute_queued_methods()
-            for game_object in self.__game_objects:
-                if game_object.get_state():
-                    game_object.update()
-            self.__physic.physic_step()
+        self.__current_frame += 1
+        self.__event_system.fire_event_one_shot("LogicFrameStart")
+        self.execute_queued_methods()
+        #Objetos adicionados durante o update entram no final da lista e também são atualizados neste frame
+        self.__begin_iteration()
+        for game_object in self.__game_objects:
+            if game_object.get_state():
+                game_object.update()
+        if self.__world is not None:
+            self.__world.run_systems()
+        self.__end_iteration()
+        #As chamadas de colisão acontecem enquanto os pares de colisores são percorridos
+        self.__begin_iteration()
+        self.__physic.physic_step()
+        self.__end_iteration()
 
     def __draw(self):
         """
@@ -327,23 +593,66 @@ class Application(Object):
         """
 
 
-        self.__render_interpolation = ((time.time() - self.__last_update_timestamp)
-        / self.__logic_frame_duration)
+        self.__render_interpolation = self.__accumulator_ns/self.__logic_frame_duration_ns
         if self.__pause_game:
             self.__render_interpolation = 0
+        self.__culled_render_count = 0
+        self.__drawn_render_count = 0
 
-        self.__application_display.fill((0, 0, 0))
+        if self.__dirty_rect_mode:
+            self.__restore_dirty_rects()
+        else:
+            self.__application_display.fill((0, 0, 0))
         if not self.__pause_game:
+            self.__begin_iteration()
             for game_object in self.__game_objects:
                 game_object.async_update()
+            self.__end_iteration()
+            self.__begin_iteration()
             for sorting_layer in self.__sorting_layers[::-1]:
-                for game_object in sorting_layer:
+                if not sorting_layer:
+                    continue
+                for game_object in sorting_layer.values():
                     if game_object.get_state():
                         game_object.draw()
+                self.flush_render_queue()
+            self.__end_iteration()
         else:
             self.__pause_text.draw()
+            self.flush_render_queue()
 
-        pygame.display.flip()
+        if self.__dirty_rect_mode and not self.__full_redraw:
+            pygame.display.update(self.__restored_rects + self.__drawn_rects)
+        else:
+            pygame.display.flip()
+        self.__full_redraw = False
+        self.__last_draw_timestamp_ns = time.perf_counter_ns()
+
+    def __restore_dirty_rects(self):
+        """
+        Apaga o que foi desenhado no frame anterior restaurando o plano de fundo.
+        A tela inteira é restaurada quando o plano de fundo ou o estado de pausa mudam
+        """
+        if self.__pause_game != self.__paused_in_last_draw:
+            self.__paused_in_last_draw = self.__pause_game
+            self.__full_redraw = True
+
+        self.__restored_rects = self.__drawn_rects
+        self.__drawn_rects = list()
+        display = self.__application_display
+        background = None if self.__pause_game else self.__background_surface
+
+        if self.__full_redraw:
+            if background is None:
+                display.fill((0, 0, 0))
+            else:
+                display.blit(background, (0, 0))
+        elif background is None:
+            for rect in self.__restored_rects:
+                display.fill((0, 0, 0), rect)
+        else:
+            for rect in self.__restored_rects:
+                display.blit(background, rect, rect)
 
     def run(self):
         """
@@ -375,3 +684,22 @@ class Application(Object):
 
             self.__update()
             self.__draw()
+            self.__wait_for_next_frame()
+
+    def __wait_for_next_frame(self):
+        """
+        Espera o próximo frame lógico ou de renderização de acordo com a estratégia de espera
+        """
+        if self.__idle_strategy == 'busy':
+            return
+        if self.__idle_strategy == 'yield':
+            time.sleep(0)
+            return
+
+        now = time.perf_counter_ns()
+        elapsed = now - self.__last_loop_timestamp_ns
+        wait_ns = self.__logic_frame_duration_ns - self.__accumulator_ns - elapsed
+        if self.__render_frame_duration_ns:
+            wait_ns = min(wait_ns, self.__last_draw_timestamp_ns + self.__render_frame_duration_ns - now)
+        if wait_ns > 0:
+            time.sleep(wait_ns/1e9)
@@ -0,0 +1,124 @@
+"""
+Esse módulo contem o buffer de comandos, que adia alterações estruturais feitas enquanto
+os GameObjects e colisores estão sendo percorridos
+"""
+
+from typing import Callable, List, Tuple, Type
+from engine.core.objects import Component, GameObject, Object
+
+
+class CommandBuffer(Object):
+
+    """
+    Esta classe registra alterações estruturais (criar e destruir GameObjects, ativar e desativar
+    objetos ou componentes, adicionar e remover componentes) e as aplica em lote com apply().
+    A aplicação chama apply() nos pontos de sincronização do frame: depois do update dos GameObjects,
+    depois do passo de física e depois do async_update e do desenho.
+    Os comandos são aplicados na ordem em que foram registrados e comandos registrados
+    durante apply() são aplicados no mesmo ponto de sincronização
+    """
+
+    SPAWN = 0
+    DESTROY = 1
+    ENABLE = 2
+    DISABLE = 3
+    ADD_COMPONENT = 4
+    REMOVE_COMPONENT = 5
+    CALL = 6
+
+    def __init__(self, application: "Application"):
+        super().__init__()
+        self.__application = application
+        self.__commands: List[Tuple] = list()
+
+    def spawn(self, setup: Callable[[GameObject], None] = None):
+        """
+        Cria um novo GameObject no próximo ponto de sincronização e o passa para setup
+        """
+        self.__commands.append((CommandBuffer.SPAWN, setup))
+
+    def destroy(self, game_object: GameObject):
+        """
+        Remove o GameObject da aplicação no próximo ponto de sincronização
+        """
+        self.__commands.append((CommandBuffer.DESTROY, game_object))
+
+    def enable(self, target):
+        """
+        Ativa um GameObject ou um componente no próximo ponto de sincronização
+        """
+        self.__commands.append((CommandBuffer.ENABLE, target))
+
+    def disable(self, target):
+        """
+        Desativa um GameObject ou um componente no próximo ponto de sincronização
+        """
+        self.__commands.append((CommandBuffer.DISABLE, target))
+
+    def add_component(self, game_object: GameObject, component_constructor: Callable[[], Component],
+    setup: Callable[[Component], None] = None):
+        """
+        Adiciona um componente ao GameObject no próximo ponto de sincronização e o passa para setup
+        """
+        self.__commands.append((CommandBuffer.ADD_COMPONENT, game_object, component_constructor, setup))
+
+    def remove_component(self, game_object: GameObject, component_class: Type, component_id: int = None):
+        """
+        Remove um componente do GameObject no próximo ponto de sincronização
+        """
+        self.__commands.append((CommandBuffer.REMOVE_COMPONENT, game_object, component_class, component_id))
+
+    def call(self, function: Callable, *args):
+        """
+        Executa uma função qualquer no próximo ponto de sincronização
+        """
+        self.__commands.append((CommandBuffer.CALL, function, args))
+
+    def get_command_count(self) -> int:
+        """
+        Retorna o número de comandos aguardando o próximo ponto de sincronização
+        """
+        return len(self.__commands)
+
+    def apply(self):
+        """
+        Aplica todos os comandos registrados
+        """
+        application = self.__application
+        while self.__commands:
+            commands = self.__commands
+            self.__commands = list()
+            #Comandos destinados a objetos destruidos neste lote são ignorados
+            destroyed = set()
+            for command in commands:
+                kind = command[0]
+                if kind == CommandBuffer.CALL:
+                    command[1](*command[2])
+                elif kind == CommandBuffer.SPAWN:
+                    game_object = application.add_game_object()
+                    if command[1] is not None:
+                        command[1](game_object)
+                elif kind == CommandBuffer.DESTROY:
+                    if command[1].get_id() not in destroyed:
+                        destroyed.add(command[1].get_id())
+                        application.remove_game_object(command[1])
+                elif kind == CommandBuffer.ENABLE or kind == CommandBuffer.DISABLE:
+                    target = command[1]
+                    owner = target if isinstance(target, GameObject) else target.get_owner()
+                    if owner.get_id() in destroyed:
+                        continue
+                    if isinstance(target, GameObject):
+                        target.set_state(kind == CommandBuffer.ENABLE)
+                    elif kind == CommandBuffer.ENABLE:
+                        target.enable()
+                    else:
+                        target.disable()
+                elif kind == CommandBuffer.ADD_COMPONENT:
+                    if command[1].get_id() in destroyed:
+                        continue
+                    component = command[1].add_component(command[2])
+                    if command[3] is not None:
+                        command[3](component)
+                elif kind == CommandBuffer.REMOVE_COMPONENT:
+                    if command[1].get_id() not in destroyed:
+                        command[1].remove_component(command[2], command[3])
@@ -0,0 +1,272 @@
+"""
+Camada opcional de entidades, componentes e sistemas (ECS).
+As entidades são agrupadas em arquétipos de acordo com o conjunto de classes dos seus componentes
+e os componentes de uma mesma classe ficam juntos em uma coluna do arquétipo.
+As consultas percorrem as colunas diretamente, sem passar pelos GameObjects.
+"""
+
+from typing import Callable, Dict, FrozenSet, Iterator, List, Tuple, Type
+from engine.core.objects import Object
+
+
+class Archetype(Object):
+
+    """
+    Armazena todas as entidades que possuem exatamente o mesmo conjunto de classes de componentes.
+    Cada classe possui uma coluna e cada entidade ocupa a mesma linha em todas as colunas
+    """
+
+    def __init__(self, component_types: FrozenSet[Type]):
+        super().__init__()
+        self.component_types = component_types
+        self.entities: List[int] = list()
+        self.columns: Dict[Type, List] = {component_type: list() for component_type in component_types}
+
+    def __len__(self):
+        return len(self.entities)
+
+    def append(self, entity: int, components: Dict[Type, object]) -> int:
+        """
+        Adiciona uma entidade ao final das colunas e retorna a sua linha
+        """
+        self.entities.append(entity)
+        for component_type, column in self.columns.items():
+            column.append(components[component_type])
+        return len(self.entities) - 1
+
+    def swap_remove(self, row: int) -> int:
+        """
+        Remove uma linha movendo a última linha para o seu lugar.
+        Retorna a entidade que foi movida, ou None se a linha removida era a última
+        """
+        last = len(self.entities) - 1
+        moved_entity = None
+        if row != last:
+            moved_entity = self.entities[last]
+            self.entities[row] = moved_entity
+            for column in self.columns.values():
+                column[row] = column[last]
+        self.entities.pop()
+        for column in self.columns.values():
+            column.pop()
+        return moved_entity
+
+    def get_row(self, row: int) -> Dict[Type, object]:
+        """
+        Retorna os componentes de uma linha indexados pela classe
+        """
+        return {component_type: column[row] for component_type, column in self.columns.items()}
+
+    def matches(self, query_types: Tuple[Type, ...]) -> Tuple[Type, ...]:
+        """
+        Retorna as colunas que atendem cada classe consultada (subclasses também são aceitas),
+        ou None se o arquétipo não atende a consulta
+        """
+        matched = list()
+        for query_type in query_types:
+            if query_type in self.component_types:
+                matched.append(query_type)
+                continue
+            column_type = None
+            for component_type in self.component_types:
+                if issubclass(component_type, query_type):
+                    column_type = component_type
+                    break
+            if column_type is None:
+                return None
+            matched.append(column_type)
+        return tuple(matched)
+
+
+class World(Object):
+
+    """
+    Esta classe guarda as entidades e executa os sistemas.
+    Uma entidade é apenas um número inteiro; apenas um componente de cada classe é armazenado por entidade.
+    Os GameObjects podem ser espelhados no mundo, então os componentes tradicionais
+    (LogicComponent, RenderComponent e DataComponent) também podem ser consultados
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__next_entity = 0
+        self.__archetypes: Dict[FrozenSet[Type], Archetype] = dict()
+        self.__locations: Dict[int, Tuple[Archetype, int]] = dict()
+        self.__query_cache: Dict[Tuple[Type, ...], List[Tuple[Archetype, Tuple[Type, ...]]]] = dict()
+        self.__systems: List[Callable[["World"], None]] = list()
+
+    def __get_archetype(self, component_types: FrozenSet[Type]) -> Archetype:
+        """
+        Retorna o arquétipo do conjunto de classes, criando-o e atualizando as consultas armazenadas se necessário
+        """
+        archetype = self.__archetypes.get(component_types)
+        if archetype is None:
+            archetype = Archetype(component_types)
+            self.__archetypes[component_types] = archetype
+            for query_types, matches in self.__query_cache.items():
+                columns = archetype.matches(query_types)
+                if columns is not None:
+                    matches.append((archetype, columns))
+        return archetype
+
+    def __move(self, entity: int, components: Dict[Type, object]):
+        """
+        Move a entidade para o arquétipo correspondente aos componentes fornecidos
+        """
+        location = self.__locations.get(entity)
+        if location is not None:
+            self.__remove_row(*location)
+        archetype = self.__get_archetype(frozenset(components))
+        self.__locations[entity] = (archetype, archetype.append(entity, components))
+
+    def __remove_row(self, archetype: Archetype, row: int):
+        """
+        Remove uma linha de um arquétipo e atualiza a linha da entidade que foi movida
+        """
+        moved_entity = archetype.swap_remove(row)
+        if moved_entity is not None:
+            self.__locations[moved_entity] = (archetype, row)
+
+    def create_entity(self, *components) -> int:
+        """
+        Cria uma nova entidade com os componentes fornecidos e retorna o seu identificador
+        """
+        entity = self.__next_entity
+        self.__next_entity += 1
+        components_by_type = dict()
+        for component in components:
+            components_by_type.setdefault(type(component), component)
+        self.__move(entity, components_by_type)
+        return entity
+
+    def destroy_entity(self, entity: int):
+        """
+        Remove a entidade e todos os seus componentes do mundo
+        """
+        location = self.__locations.pop(entity, None)
+        if location is not None:
+            self.__remove_row(*location)
+
+    def has_entity(self, entity: int) -> bool:
+        """
+        Retorna verdadeiro se a entidade existe
+        """
+        return entity in self.__locations
+
+    def get_entity_count(self) -> int:
+        """
+        Retorna o número de entidades do mundo
+        """
+        return len(self.__locations)
+
+    def get_archetype_count(self) -> int:
+        """
+        Retorna o número de arquétipos criados
+        """
+        return len(self.__archetypes)
+
+    def add_component(self, entity: int, component):
+        """
+        Adiciona ou substitui o componente da classe do componente fornecido
+        """
+        archetype, row = self.__locations[entity]
+        component_type = type(component)
+        if component_type in archetype.columns:
+            archetype.columns[component_type][row] = component
+            return
+        components = archetype.get_row(row)
+        components[component_type] = component
+        self.__move(entity, components)
+
+    def remove_component(self, entity: int, component_type: Type):
+        """
+        Remove o componente da classe fornecida da entidade
+        """
+        archetype, row = self.__locations[entity]
+        if component_type not in archetype.columns:
+            return
+        components = archetype.get_row(row)
+        del components[component_type]
+        self.__move(entity, components)
+
+    def has_component(self, entity: int, component_type: Type) -> bool:
+        """
+        Retorna verdadeiro se a entidade possui um componente exatamente da classe fornecida
+        """
+        return component_type in self.__locations[entity][0].columns
+
+    def get_component(self, entity: int, component_type: Type):
+        """
+        Retorna o componente da classe fornecida (ou de uma subclasse), ou None se a entidade não o possuir
+        """
+        archetype, row = self.__locations[entity]
+        column = archetype.columns.get(component_type)
+        if column is not None:
+            return column[row]
+        for column_type, column in archetype.columns.items():
+            if issubclass(column_type, component_type):
+                return column[row]
+        return None
+
+    def __get_matches(self, query_types: Tuple[Type, ...]) -> List[Tuple[Archetype, Tuple[Type, ...]]]:
+        """
+        Retorna os arquétipos que atendem a consulta. O resultado é armazenado e atualizado
+        quando novos arquétipos são criados
+        """
+        matches = self.__query_cache.get(query_types)
+        if matches is None:
+            matches = list()
+            for archetype in self.__archetypes.values():
+                columns = archetype.matches(query_types)
+                if columns is not None:
+                    matches.append((archetype, columns))
+            self.__query_cache[query_types] = matches
+        return matches
+
+    def query_chunks(self, *query_types: Type) -> Iterator[Tuple[List[int], Tuple[List, ...]]]:
+        """
+        Retorna, para cada arquétipo que atende a consulta, a lista de entidades e as colunas
+        na ordem das classes consultadas. As colunas não devem ser alteradas durante a iteração
+        """
+        for archetype, columns in self.__get_matches(query_types):
+            if archetype.entities:
+                yield archetype.entities, tuple(archetype.columns[column] for column in columns)
+
+    def query(self, *query_types: Type) -> Iterator[Tuple]:
+        """
+        Percorre todas as entidades que possuem componentes das classes fornecidas
+        retornando linhas (entidade, componente_1, componente_2, ...).
+        Por exemplo: for entity, rigid_body, collider in world.query(Rigidbody, CircleCollider)
+        As linhas são copiadas de cada arquétipo antes de serem percorridas, então o mundo pode ser alterado durante a iteração.
+        Entidades de GameObjects desativados também são retornadas
+        """
+        for entities, columns in self.query_chunks(*query_types):
+            yield from zip(list(entities), *[list(column) for column in columns])
+
+    def register_system(self, system: Callable[["World"], None]):
+        """
+        Registra um sistema, uma função que recebe o mundo e é executada uma vez por frame lógico
+        """
+        self.__systems.append(system)
+
+    def remove_system(self, system: Callable[["World"], None]):
+        """
+        Remove um sistema registrado
+        """
+        self.__systems.remove(system)
+
+    def run_systems(self):
+        """
+        Executa todos os sistemas na ordem em que foram registrados
+        """
+        for system in self.__systems:
+            system(self)
+
+    def register_game_object(self, game_object) -> int:
+        """
+        Espelha um GameObject no mundo. Os componentes adicionados ou removidos
+        depois disso também são atualizados no mundo
+        """
+        entity = self.create_entity(*game_object.get_components())
+        game_object.set_entity(self, entity)
+        return entity
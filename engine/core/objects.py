@@ -4,10 +4,15 @@ Esse módulo contem a definição das classes mais importantes da aplicação
 
 from __future__ import annotations
 import os
-import time
-from typing import Callable, Type, List, Tuple
+import hashlib
+import mmap
+import struct
+import threading
+from typing import Callable, Dict, Type, List, Tuple
 import math
 from abc import ABC
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import pygame
 from pygame.math import Vector2
 from pygame import gfxdraw
@@ -133,9 +138,11 @@ class LogicComponent(Component):
         Função que é a chamada a cada loop da aplicação
         """
  
-    def on_collision_enter(self, other: "Collider", contact_point: Vector2, relative_velocity: Vector2):
+    def on_collision_enter(self, other: "Collider", contact_point: Vector2, normal: Vector2):
         """
-        Função chamada quando uma colisão for detectada
+        Função chamada quando uma colisão for detectada.
+        normal é o vetor unitario que aponta deste objeto para o outro colisor.
+        contact_point pode ser None quando a forma não calcula o ponto de contato
         """
 
 class Rigidbody(LogicComponent):
@@ -146,17 +153,71 @@ class Rigidbody(LogicComponent):
 
     def __init__(self):
         super().__init__()
+        self.__transform = None
+        self.__sleeping = False
+        self.__rest_frames = 0
         self.velocity = Vector2()
         self.angular_velocity = 0.0
         self.linear_drag = 0.0
         self.angular_drag = 0.0
         self.mass = 50
 
+    def is_sleeping(self) -> bool:
+        """
+        Retorna se o corpo esta dormindo. Corpos dormindo não são integrados
+        e pares de corpos dormindo não passam pela fase estreita
+        """
+        return self.__sleeping
+
+    def sleep(self):
+        """
+        Coloca o corpo para dormir e zera suas velocidades
+        """
+        self.__sleeping = True
+        self.velocity.update(0.0, 0.0)
+        self.angular_velocity = 0.0
+
+    def on_enable(self):
+        self.wake_up()
+
+    def wake_up(self):
+        """
+        Acorda o corpo
+        """
+        if self.__sleeping:
+            self.__sleeping = False
+            self.__rest_frames = 0
+
+    def update_rest_frames(self, velocity_threshold: float) -> int:
+        """
+        Atualiza e retorna o número de frames lógicos consecutivos
+        em que o corpo ficou praticamente parado
+        """
+        if (self.velocity.magnitude_squared() <= velocity_threshold*velocity_threshold
+        and abs(self.angular_velocity) <= velocity_threshold):
+            self.__rest_frames += 1
+        else:
+            self.__rest_frames = 0
+        return self.__rest_frames
+
+    def on_component_creation(self):
+        self.__transform = self.get_owner().get_transform()
+
     def update(self):
-        self.velocity -= self.velocity*self.linear_drag
-        self.angular_velocity -= self.angular_velocity*self.angular_drag
-        self.get_owner().get_transform().position += self.velocity
-        self.get_owner().get_transform().rotation += self.angular_velocity
+        velocity = self.velocity
+        if self.__sleeping:
+            if velocity.x == 0.0 and velocity.y == 0.0 and self.angular_velocity == 0.0:
+                return
+            #Algum script alterou a velocidade do corpo
+            self.wake_up()
+        #As operações são feitas no próprio vetor, sem criar vetores temporários
+        if self.linear_drag:
+            velocity *= 1.0 - self.linear_drag
+        if self.angular_drag:
+            self.angular_velocity -= self.angular_velocity*self.angular_drag
+        transform = self.__transform
+        transform.position += velocity
+        transform.rotation += self.angular_velocity
 
 class RenderComponent(Component):
     """
@@ -166,6 +227,15 @@ class RenderComponent(Component):
         self.rigid_body = None
         super().__init__()  
         self.__sorting_layer_index = 0
+        self.__application = None
+
+    def get_application(self) -> "Application":
+        """
+        Retorna a aplicação do dono deste componente, armazenando a referencia após a primeira busca
+        """
+        if self.__application is None:
+            self.__application = self.get_owner().get_application()
+        return self.__application
 
     def get_sorting_layer_index(self) -> int:
         """
@@ -179,33 +249,54 @@ class RenderComponent(Component):
         """
         self.__sorting_layer_index = self.get_owner().change_component_sorting_layer(self, index)
 
+    def get_rigid_body(self) -> "Rigidbody":
+        """
+        Retorna o corpo rigido do dono deste componente. Enquanto ele não for encontrado
+        a busca é repetida, então um Rigidbody adicionado depois também é utilizado
+        """
+        if self.rigid_body is None:
+            self.rigid_body = self.get_owner().get_component(Rigidbody)
+        return self.rigid_body
+
+    def get_draw_coordinates(self):
+        """
+        Retorna as coordenadas (x, y) em que o objeto sera desenhado, sem criar vetores.
+        Se ele tiver um corpo rigido associado, a posição é interpolada com a velocidade
+        """
+        rigid_body = self.get_rigid_body()
+        position = self.get_owner().get_transform().position
+        if rigid_body is None:
+            return (position.x, position.y)
+        alpha = self.get_application().get_render_interpolation()
+        velocity = rigid_body.velocity
+        return (position.x + velocity.x*alpha, position.y + velocity.y*alpha)
+
     def get_draw_position(self):
         """
         Essa função calcula a posição que o objeto sera desenhado
         Se ele tiver um corpo rigido associado a ele, sera levado em conta
         a velocidade do objeto.
         """
-
-        if self.rigid_body is None:
-            self.rigid_body = self.get_owner().get_component(Rigidbody)
-            if self.rigid_body is None:
-                return self.get_owner().get_transform().position
-
-        draw_position = self.rigid_body.velocity*self.get_owner().get_application().get_render_interpolation()
-        draw_position += self.get_owner().get_transform().position
-        return draw_position
+        return Vector2(self.get_draw_coordinates())
 
     def get_draw_rotation(self):
         """
         Essa função retorna a rotação que sera utilizada para desenhar o objeto
         """
-        if self.rigid_body is None:
-            self.rigid_body = self.get_owner().get_component(Rigidbody)
-            if self.rigid_body is None:
-                return self.get_owner().get_transform().rotation
-        return angle_interpolation(self.get_owner().get_transform().rotation, 
-        self.get_owner().get_transform().rotation+self.rigid_body.angular_velocity,
-        self.get_owner().get_application().get_render_interpolation())
+        rigid_body = self.get_rigid_body()
+        if rigid_body is None:
+            return self.get_owner().get_transform().rotation
+        rotation = self.get_owner().get_transform().rotation
+        return angle_interpolation(rotation, rotation + rigid_body.angular_velocity,
+        self.get_application().get_render_interpolation())
+
+    def get_screen_bounds(self) -> Tuple[float, float, float, float]:
+        """
+        Retorna uma caixa (min_x, min_y, max_x, max_y) que contem tudo o que o componente desenha,
+        utilizada para descartar componentes fora da tela antes de qualquer transformação.
+        None indica que o componente deve sempre ser desenhado
+        """
+        return None
 
     def draw(self):
         """
@@ -252,25 +343,44 @@ class CircleRenderer(RenderComponent):
         super().__init__()
         self.__radius = 20
         self.__color = (255, 255, 255)
+        self.__surface = None
+
+    def get_surface(self) -> pygame.Surface:
+        """
+        Retorna uma superficie com o circulo desenhado, criada apenas quando o raio ou a cor mudam
+        """
+        if self.__surface is None:
+            size = 2*self.__radius + 1
+            self.__surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            gfxdraw.aacircle(self.__surface, self.__radius, self.__radius, self.__radius, self.__color)
+            gfxdraw.filled_circle(self.__surface, self.__radius, self.__radius, self.__radius, self.__color)
+        return self.__surface
+
+    def get_screen_bounds(self) -> Tuple[float, float, float, float]:
+        position = self.get_owner().get_transform().position
+        return (position.x - self.__radius, position.y - self.__radius,
+        position.x + self.__radius, position.y + self.__radius)
 
     def draw(self):
-        draw_pos = self.get_draw_position()
-        gfxdraw.aacircle(self.get_owner().get_application().get_display(),
-        int(draw_pos[0]), int(draw_pos[1]), self.__radius, self.__color)
-        gfxdraw.filled_circle(self.get_owner().get_application().get_display(),
-        int(draw_pos[0]), int(draw_pos[1]), self.__radius, self.__color)
+        draw_pos = self.get_draw_coordinates()
+        self.get_application().submit_blit(self.get_surface(),
+        (int(draw_pos[0]) - self.__radius, int(draw_pos[1]) - self.__radius))
 
     def set_radius(self, radius: float):
         """
         Seta o raio do circulo
         """
-        self.__radius = radius
+        if radius != self.__radius:
+            self.__radius = radius
+            self.__surface = None
 
     def set_color(self, color: Tuple[int, int, int]):
         """
         Seta a cor do circulo
         """
-        self.__color = color
+        if color != self.__color:
+            self.__color = color
+            self.__surface = None
 
     def get_radius(self) -> float:
         """
@@ -305,6 +415,7 @@ class BackgroundRenderer(RenderComponent):
         new_size = (self.__display.get_width(), self.__display.get_height())
         self.__sprite = pygame.transform.scale(self.__sprite, new_size)
         self.__sprite = self.__sprite.convert()
+        self.get_owner().get_application().set_background_surface(self.__sprite)
 
     def set_new_sprite(self, identifier: str):
         """
@@ -315,7 +426,10 @@ class BackgroundRenderer(RenderComponent):
         self.fit_to_screen()
 
     def draw(self):
-        self.__display.blit(self.__sprite, (0,0))
+        if self.get_application().get_dirty_rect_mode():
+            #No modo de retangulos sujos a aplicação restaura o plano de fundo
+            return
+        self.get_application().submit_blit(self.__sprite, (0,0))
 
 
 
@@ -327,51 +441,448 @@ class MouseFollower(LogicComponent):
         self.get_owner().get_transform().position = self.get_owner().get_application().get_mouse().get_mouse_position()
 
 
+class AssetHandle(Object):
+
+    """
+    Esta classe representa um recurso que esta sendo carregado em segundo plano.
+    O arquivo é decodificado em um conjunto de threads compartilhado e get() bloqueia apenas
+    se o recurso for necessário antes de terminar de carregar.
+    A função finalize é executada uma única vez, na thread que chamou get()
+    """
+
+    __executor = None
+    __worker_count = min(8, os.cpu_count() or 1)
+
+    def __init__(self, load_function: Callable, *args, finalize: Callable = None):
+        super().__init__()
+        self.__future = AssetHandle.get_executor().submit(load_function, *args)
+        self.__finalize = finalize
+        self.__asset = None
+        self.__resolved = False
+
+    @staticmethod
+    def get_executor() -> ThreadPoolExecutor:
+        """
+        Retorna o conjunto de threads usado para carregar os recursos, criando-o se necessário
+        """
+        if AssetHandle.__executor is None:
+            AssetHandle.__executor = ThreadPoolExecutor(max_workers=AssetHandle.__worker_count)
+        return AssetHandle.__executor
+
+    @staticmethod
+    def set_worker_count(worker_count: int):
+        """
+        Altera o número de threads usadas para carregar recursos.
+        Deve ser chamado antes do primeiro carregamento
+        """
+        if AssetHandle.__executor is not None:
+            raise Exception("O número de threads deve ser alterado antes de carregar qualquer recurso")
+        AssetHandle.__worker_count = max(1, worker_count)
+
+    def is_ready(self) -> bool:
+        """
+        Retorna verdadeiro se o recurso ja terminou de carregar
+        """
+        return self.__resolved or self.__future.done()
+
+    def get(self):
+        """
+        Retorna o recurso carregado, esperando o carregamento terminar se necessário
+        """
+        if not self.__resolved:
+            asset = self.__future.result()
+            if self.__finalize is not None:
+                asset = self.__finalize(asset)
+            self.__asset = asset
+            self.__resolved = True
+            self.__future = None
+            self.__finalize = None
+        return self.__asset
+
 class ImageLoader(Object):
 
     """
-    Esta classe é responsável por carregar imagens
+    Esta classe é responsável por carregar imagens.
+    As imagens são decodificadas em segundo plano e só são aguardadas quando forem usadas pela primeira vez
     """
 
+    CACHE_VERSION = 2
+    #Versão do cache, data de modificação e tamanho da imagem original, largura, altura e formato dos pixels
+    CACHE_HEADER = '<IqqII4s'
+
     def __init__(self):
         super().__init__()
         self.__loaded_images = dict()
+        self.__pending_images = dict()
+        self.__scaled_images = dict()
+        self.__atlases = dict()
+        self.__cache_directory = None
         
         self.load_new_image('default.png','default')
 
-    def load_new_image(self, image_name: str, identifier: str):
+    @staticmethod
+    def get_image_path(image_name: str) -> str:
+        """
+        Retorna o caminho completo de uma imagem da pasta de recursos
+        """
+        return os.path.join(os.getcwd(), "assets", "images", image_name)
+
+    def set_decoded_image_cache(self, cache_directory: str):
+        """
+        Ativa o cache de imagens decodificadas. Os pixels de cada imagem são gravados em cache_directory
+        e, nas próximas execuções, são mapeados na memoria em vez de decodificar o arquivo novamente.
+        None desativa o cache
+        """
+        if cache_directory is not None:
+            os.makedirs(cache_directory, exist_ok=True)
+        self.__cache_directory = cache_directory
+
+    def get_decoded_image_cache(self) -> str:
+        """
+        Retorna a pasta do cache de imagens decodificadas, ou None se o cache estiver desativado
+        """
+        return self.__cache_directory
+
+    def decode_image(self, path: str) -> pygame.Surface:
+        """
+        Decodifica uma imagem, utilizando o cache de imagens decodificadas quando ele estiver ativo.
+        Pode ser executado no conjunto de threads de carregamento
+        """
+        if self.__cache_directory is None:
+            return pygame.image.load(path)
+        #Cada imagem possui um único arquivo no cache, identificado pelo caminho.
+        #A data de modificação e o tamanho da imagem ficam no cabeçalho do arquivo, então uma
+        #entrada desatualizada é sobrescrita em vez de ficar esquecida na pasta do cache
+        stat = os.stat(path)
+        source_key = (ImageLoader.CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+        cache_name = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest() + '.raw'
+        cache_path = os.path.join(self.__cache_directory, cache_name)
+        if os.path.exists(cache_path):
+            try:
+                image = ImageLoader.__read_cached_image(cache_path, source_key)
+                if image is not None:
+                    return image
+            except (OSError, ValueError, struct.error):
+                pass
+        image = pygame.image.load(path)
+        if image.get_colorkey() is None:
+            ImageLoader.__write_cached_image(cache_path, image, source_key)
+        elif os.path.exists(cache_path):
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+        return image
+
+    @staticmethod
+    def __read_cached_image(cache_path: str, source_key: Tuple[int, int, int]) -> pygame.Surface:
+        """
+        Cria uma superficie a partir dos pixels mapeados na memoria de um arquivo do cache.
+        Retorna None se o arquivo foi gravado para outra versão da imagem ou do cache
+        """
+        with open(cache_path, 'rb') as cache_file:
+            #ACCESS_COPY permite que a superficie seja modificada sem alterar o arquivo
+            buffer = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_COPY)
+        version, mtime_ns, size, width, height, pixel_format = struct.unpack_from(ImageLoader.CACHE_HEADER, buffer)
+        if (version, mtime_ns, size) != source_key:
+            buffer.close()
+            return None
+        pixel_format = pixel_format.rstrip(b' ').decode('ascii')
+        header_size = struct.calcsize(ImageLoader.CACHE_HEADER)
+        if len(buffer) != header_size + width*height*len(pixel_format):
+            raise ValueError("Arquivo de cache incompleto: " + cache_path)
+        return pygame.image.frombuffer(memoryview(buffer)[header_size:], (width, height), pixel_format)
+
+    @staticmethod
+    def __write_cached_image(cache_path: str, image: pygame.Surface, source_key: Tuple[int, int, int]):
+        """
+        Grava os pixels decodificados de uma imagem no cache, substituindo a entrada anterior da mesma imagem
+        """
+        pixel_format = 'RGBA' if image.get_flags() & pygame.SRCALPHA else 'RGB'
+        header = struct.pack(ImageLoader.CACHE_HEADER, *source_key, image.get_width(), image.get_height(),
+        pixel_format.ljust(4).encode('ascii'))
+        #O arquivo é escrito com outro nome e renomeado para que uma leitura nunca encontre um arquivo pela metade
+        temporary_path = "{}.{}.tmp".format(cache_path, threading.get_ident())
+        try:
+            with open(temporary_path, 'wb') as cache_file:
+                cache_file.write(header)
+                cache_file.write(pygame.image.tostring(image, pixel_format))
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def load_new_image(self, image_name: str, identifier: str) -> AssetHandle:
         """
         Esse método carrega uma nova imagem e o associa ao identificador
         que foi passado para o método
         """
-        path = os.path.join(os.getcwd(), "assets", "images", image_name)
-        self.__loaded_images[identifier] = pygame.image.load(str(path))
+        handle = AssetHandle(self.decode_image, self.get_image_path(image_name))
+        self.__pending_images[identifier] = handle.get
+        return handle
+
+    def __resolve(self, identifier: str):
+        """
+        Espera o carregamento de uma imagem ou sequencia pendente e a armazena
+        """
+        resolve = self.__pending_images.pop(identifier, None)
+        if resolve is not None:
+            self.__loaded_images[identifier] = resolve()
+        return self.__loaded_images[identifier]
+
+    def is_loaded(self, identifier: str) -> bool:
+        """
+        Retorna verdadeiro se a imagem ou sequencia ja pode ser usada sem esperar
+        """
+        return identifier not in self.__pending_images
 
     def get_image(self, identifier: str):
         """
         Retorna uma imagem que foi previamente carregada
         """
-        return self.__loaded_images[identifier]
+        return self.__resolve(identifier)
+
+    def get_scaled_image(self, identifier: str, size: Tuple[int, int], size_class_step: int = 1):
+        """
+        Retorna a imagem redimensionada para o tamanho em pixels desejado.
+        As versões redimensionadas são armazenadas e compartilhadas entre todos os renderizadores,
+        por isso a superficie retornada não deve ser modificada.
+        Quando size_class_step for maior que 1 o tamanho é arredondado para um múltiplo dele,
+        para que objetos de tamanhos parecidos compartilhem a mesma superficie.
+        """
+        width, height = size
+        if size_class_step > 1:
+            width = max(size_class_step, round(width/size_class_step)*size_class_step)
+            height = max(size_class_step, round(height/size_class_step)*size_class_step)
+        key = (identifier, width, height)
+        scaled_image = self.__scaled_images.get(key)
+        if scaled_image is None:
+            scaled_image = pygame.transform.scale(self.get_image(identifier), (width, height)).convert_alpha()
+            self.__scaled_images[key] = scaled_image
+        return scaled_image
+
+    def get_scaled_image_count(self) -> int:
+        """
+        Retorna o número de versões redimensionadas armazenadas
+        """
+        return len(self.__scaled_images)
+
+    def clear_scaled_images(self):
+        """
+        Descarta todas as versões redimensionadas armazenadas
+        """
+        self.__scaled_images.clear()
 
     def create_sprite_sequence(self, identifier: str):
         """
         Cria uma lista de sprites para ser usada em animacao
         """
         self.__loaded_images[identifier] = list()
+        self.__pending_images.pop(identifier, None)
 
-    def load_image_to_sprite_sequence(self, image_name: str, sequence_identifier):
+    def load_image_to_sprite_sequence(self, image_name: str, sequence_identifier) -> AssetHandle:
         """
         Carrega uma imagem para a sequencia desejada
         """
-        path = os.path.join(os.getcwd(), "assets", "images", image_name)
-        image = pygame.image.load(path)        
-        self.__loaded_images[sequence_identifier].append(image.convert_alpha())
+        frames = self.__loaded_images[sequence_identifier]
+        handle = AssetHandle(self.decode_image, self.get_image_path(image_name), finalize=pygame.Surface.convert_alpha)
+        frames.append(handle)
+        self.__pending_images[sequence_identifier] = lambda: self.__resolve_frames(frames)
+        return handle
+
+    @staticmethod
+    def __resolve_frames(frames: List) -> List[pygame.Surface]:
+        """
+        Substitui os frames pendentes de uma sequencia pelas superficies carregadas
+        """
+        for i, frame in enumerate(frames):
+            if isinstance(frame, AssetHandle):
+                frames[i] = frame.get()
+        return frames
+
+    def load_sprite_sequence(self, image_names: List[str], identifier: str):
+        """
+        Carrega em segundo plano uma sequencia de sprites a partir de uma lista de imagens
+        """
+        self.create_sprite_sequence(identifier)
+        for image_name in image_names:
+            self.load_image_to_sprite_sequence(image_name, identifier)
+
+    @staticmethod
+    def find_images(pattern: str) -> List[str]:
+        """
+        Retorna, em ordem alfabetica, os nomes das imagens da pasta de recursos que correspondem ao padrão
+        (por exemplo 'explosion/explosion*.png')
+        """
+        images_path = Path(os.getcwd(), "assets", "images")
+        return sorted(path.relative_to(images_path).as_posix() for path in images_path.glob(pattern))
+
+    @staticmethod
+    def read_manifest(manifest_name: str) -> List[str]:
+        """
+        Retorna os nomes das imagens listadas em um arquivo de manifesto da pasta de recursos,
+        um por linha. Linhas vazias e iniciadas por # são ignoradas
+        """
+        with open(ImageLoader.get_image_path(manifest_name), encoding='utf-8') as manifest:
+            lines = [line.strip() for line in manifest]
+        return [line for line in lines if line and not line.startswith('#')]
 
     def get_sprite_sequence(self, identifier: str):
         """
         Retorna a sequencia de sprites desejada
         """
-        return self.__loaded_images[identifier]
+        return self.__resolve(identifier)
+
+    def load_baked_sprite_sequence(self, image_names: List[str], identifier: str, frame_size: Tuple[int, int] = None,
+    frame_count: int = None):
+        """
+        Carrega uma sequencia de sprites empacotada em um único atlas.
+        Se frame_size for fornecido os frames são redimensionados para ele, senão mantém o tamanho das imagens.
+        Quando frame_count for menor que o número de imagens, apenas frames igualmente espaçados são carregados.
+        Os frames da sequencia são subsuperficies do atlas.
+        As imagens são decodificadas e redimensionadas em segundo plano e o atlas é montado no primeiro uso
+        """
+        if frame_count is not None and frame_count < len(image_names):
+            step = len(image_names)/frame_count
+            image_names = [image_names[int(i*step)] for i in range(frame_count)]
+        if frame_size is not None:
+            frame_size = (max(1, int(frame_size[0])), max(1, int(frame_size[1])))
+        handles = [AssetHandle(self.__load_scaled_frame, self.get_image_path(image_name), frame_size) for image_name in image_names]
+        self.__pending_images[identifier] = lambda: self.__pack_sprite_sequence([handle.get() for handle in handles], identifier)
+
+    def __load_scaled_frame(self, path: str, frame_size: Tuple[int, int]) -> pygame.Surface:
+        """
+        Decodifica e redimensiona um frame. Executado no conjunto de threads de carregamento
+        """
+        image = self.decode_image(path)
+        if frame_size is None or image.get_size() == frame_size:
+            return image
+        if image.get_bitsize() not in (24, 32):
+            #smoothscale só aceita imagens de 24 ou 32 bits
+            return pygame.transform.scale(image, frame_size)
+        return pygame.transform.smoothscale(image, frame_size)
+
+    def bake_sprite_sequence(self, identifier: str, frame_size: Tuple[int, int], frame_count: int = None):
+        """
+        Redimensiona uma sequencia já carregada e a empacota em um único atlas,
+        descartando os frames originais
+        """
+        frames = self.get_sprite_sequence(identifier)
+        if frame_count is not None and frame_count < len(frames):
+            step = len(frames)/frame_count
+            frames = [frames[int(i*step)] for i in range(frame_count)]
+        frame_size = (max(1, int(frame_size[0])), max(1, int(frame_size[1])))
+        frames = [pygame.transform.smoothscale(frame, frame_size) for frame in frames]
+        self.__pack_sprite_sequence(frames, identifier)
+
+    def get_sprite_atlas(self, identifier: str) -> pygame.Surface:
+        """
+        Retorna o atlas de uma sequencia empacotada, ou None se a sequencia não foi empacotada
+        """
+        self.__resolve(identifier)
+        return self.__atlases.get(identifier)
+
+    def __pack_sprite_sequence(self, frames: List[pygame.Surface], identifier: str):
+        """
+        Copia os frames para uma grade em um único atlas e substitui a sequencia por subsuperficies dele.
+        Todos os frames devem ter o mesmo tamanho
+        """
+        columns = max(1, math.ceil(math.sqrt(len(frames))))
+        rows = max(1, math.ceil(len(frames)/columns))
+        width, height = frames[0].get_size()
+        atlas = pygame.Surface((columns*width, rows*height), pygame.SRCALPHA).convert_alpha()
+        atlas.fill((0, 0, 0, 0))
+        sequence = list()
+        for i, frame in enumerate(frames):
+            rect = pygame.Rect((i % columns)*width, (i//columns)*height, width, height)
+            atlas.blit(frame, rect.topleft)
+            sequence.append(atlas.subsurface(rect))
+        self.__atlases[identifier] = atlas
+        self.__loaded_images[identifier] = sequence
+        return sequence
+
+class RotationCache(Object):
+
+    """
+    Esta classe armazena superficies rotacionadas que são compartilhadas por todos os renderizadores.
+    Os angulos são quantizados em passos de angle_step graus e as superficies usadas
+    há mais tempo são descartadas quando a memoria ocupada passa de max_memory_bytes
+    """
+
+    def __init__(self, angle_step: float = 2.0, max_memory_bytes: int = 64*1024*1024):
+        super().__init__()
+        self.__surfaces: OrderedDict = OrderedDict()
+        self.__step_count = max(1, round(360/angle_step))
+        self.__max_memory_bytes = max_memory_bytes
+        self.__memory_bytes = 0
+
+    def set_angle_step(self, angle_step: float):
+        """
+        Altera o passo de quantização dos angulos, em graus
+        """
+        self.__step_count = max(1, round(360/angle_step))
+        self.clear()
+
+    def set_max_memory(self, max_memory_bytes: int):
+        """
+        Altera o limite de memoria ocupada pelas superficies armazenadas
+        """
+        self.__max_memory_bytes = max_memory_bytes
+        self.__evict()
+
+    def get_memory_usage(self) -> int:
+        """
+        Retorna a memoria ocupada pelas superficies armazenadas, em bytes
+        """
+        return self.__memory_bytes
+
+    def get_surface_count(self) -> int:
+        """
+        Retorna o número de superficies armazenadas
+        """
+        return len(self.__surfaces)
+
+    def clear(self):
+        """
+        Descarta todas as superficies armazenadas
+        """
+        self.__surfaces.clear()
+        self.__memory_bytes = 0
+
+    def get_rotated_surface(self, key, surface: pygame.Surface, angle: float) -> pygame.Surface:
+        """
+        Retorna a superficie rotacionada pelo angulo (em graus) quantizado.
+        key deve identificar o conteudo da superficie, por exemplo (identificador, tamanho)
+        """
+        step = round(angle*self.__step_count/360) % self.__step_count
+        if step == 0:
+            return surface
+
+        cache_key = (key, step)
+        rotated_surface = self.__surfaces.get(cache_key)
+        if rotated_surface is not None:
+            self.__surfaces.move_to_end(cache_key)
+            return rotated_surface
+
+        rotated_surface = pygame.transform.rotate(surface, step*360/self.__step_count)
+        self.__surfaces[cache_key] = rotated_surface
+        self.__memory_bytes += self.__surface_size(rotated_surface)
+        self.__evict()
+        return rotated_surface
+
+    def __surface_size(self, surface: pygame.Surface) -> int:
+        """
+        Estima a memoria ocupada por uma superficie
+        """
+        return surface.get_width()*surface.get_height()*surface.get_bytesize()
+
+    def __evict(self):
+        """
+        Descarta as superficies usadas há mais tempo até respeitar o limite de memoria
+        """
+        while self.__memory_bytes > self.__max_memory_bytes and self.__surfaces:
+            _, surface = self.__surfaces.popitem(last=False)
+            self.__memory_bytes -= self.__surface_size(surface)
 
 class SoundManager(Object):
 
@@ -383,19 +894,33 @@ class SoundManager(Object):
         super().__init__()
         self.__loaded_sounds = dict()
 
-    def load_new_sound(self, sound_name: str, identifier: str):
+    def load_new_sound(self, sound_name: str, identifier: str) -> AssetHandle:
         """
-        Esse método carrega um som a partir de um arquivo e o associa a um identificador
+        Esse método carrega um som a partir de um arquivo e o associa a um identificador.
+        O arquivo é decodificado em segundo plano
         """
         path = os.path.join(os.getcwd(), "assets", "sounds", sound_name);
-        self.__loaded_sounds[identifier] = pygame.mixer.Sound(path)
+        handle = AssetHandle(pygame.mixer.Sound, path)
+        self.__loaded_sounds[identifier] = handle
+        return handle
+
+    def get_sound(self, identifier) -> pygame.mixer.Sound:
+        """
+        Retorna um som carregado, esperando o carregamento terminar se necessário
+        """
+        sound = self.__loaded_sounds[identifier]
+        if isinstance(sound, AssetHandle):
+            sound = sound.get()
+            self.__loaded_sounds[identifier] = sound
+        return sound
 
     def play_sound(self, identifier, volume):
         """
         Esse método toca um som usando o seu identificador e com o volume fornecido
         """
-        self.__loaded_sounds[identifier].set_volume(volume)
-        self.__loaded_sounds[identifier].play()
+        sound = self.get_sound(identifier)
+        sound.set_volume(volume)
+        sound.play()
 
 class SpriteRenderer(RenderComponent):
 
@@ -408,10 +933,18 @@ class SpriteRenderer(RenderComponent):
         self.sprite = None
         self.sprite_half_size = None
         self.__sprite_identifier = None
+        self.__rotation_cache = None
         self.current_scale = None
 
     def on_component_creation(self):
+        self.__rotation_cache = self.get_owner().get_application().get_rotation_cache()
         self.set_new_sprite('default')
+
+    def get_rotated_surface(self, key, surface: pygame.Surface, angle: float) -> pygame.Surface:
+        """
+        Retorna a superficie rotacionada (angulo em radianos) utilizando o cache compartilhado da aplicação
+        """
+        return self.__rotation_cache.get_rotated_surface(key, surface, angle*(180/math.pi))
     def get_dimensions(self) -> Vector2:
         """
         Retorna as dimensões do sprite atual
@@ -439,29 +972,103 @@ class SpriteRenderer(RenderComponent):
         """
         Este método redimensiona o sprite para o tamanho desejado
         """
-        self.sprite = pygame.transform.scale(self.sprite, (int(self.sprite.get_width()*scale_vector.x),
+        img_loader = self.get_owner().get_application().get_img_loader()
+        self.sprite = img_loader.get_scaled_image(self.__sprite_identifier, (int(self.sprite.get_width()*scale_vector.x),
         int(self.sprite.get_height()*scale_vector.y)))
         self.sprite_half_size = Vector2(self.sprite.get_width(),self.sprite.get_height())*0.5
 
-    def set_sprite_scale_in_meters(self, scale_factor):
+    def set_sprite_scale_in_meters(self, scale_factor, size_class_step: int = 1):
         """
-        Redimensiona o sprite com base no metro
+        Redimensiona o sprite com base no metro.
+        size_class_step arredonda o tamanho em pixels para um múltiplo dele (veja ImageLoader.get_scaled_image)
         """
+        img_loader = self.get_owner().get_application().get_img_loader()
         dimensions = self.get_dimensions()
         scale = dimensions.x/self.get_owner().get_application().get_meter()
-        self.sprite = pygame.transform.scale(self.get_original_sprite(), (int(scale_factor*dimensions.x/scale),
-        int(scale_factor*dimensions.y/scale)))
+        self.sprite = img_loader.get_scaled_image(self.__sprite_identifier, (int(scale_factor*dimensions.x/scale),
+        int(scale_factor*dimensions.y/scale)), size_class_step)
         self.sprite_half_size = Vector2(self.sprite.get_width(),self.sprite.get_height())*0.5
 
+    def get_screen_bounds(self) -> Tuple[float, float, float, float]:
+        #Metade da diagonal cobre o sprite em qualquer rotação
+        position = self.get_owner().get_transform().position
+        radius = math.hypot(self.sprite.get_width(), self.sprite.get_height())/2
+        return (position.x - radius, position.y - radius, position.x + radius, position.y + radius)
+
     def draw(self):
-        rotated_image = pygame.transform.rotate(self.sprite, self.get_draw_rotation()*(180/math.pi))
-        half_size = Vector2(rotated_image.get_width(), rotated_image.get_height())*0.5
-        self.get_owner().get_application().get_display().blit(rotated_image,
-        self.get_owner().get_transform().position - half_size)
+        rotated_image = self.get_rotated_surface((self.__sprite_identifier, self.sprite.get_size()),
+        self.sprite, self.get_draw_rotation())
+        x, y = self.get_draw_coordinates()
+        self.get_application().submit_blit(rotated_image, (x - rotated_image.get_width()*0.5, y - rotated_image.get_height()*0.5))
+
+class FontRegistry(Object):
+
+    """
+    Esta classe armazena as fontes e os glifos renderizados que são compartilhados por todos os textos.
+    Cada par (nome, tamanho) é resolvido por pygame.font.SysFont apenas uma vez
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__fonts = dict()
+        self.__glyphs = dict()
+
+    def get_font(self, font_name: str, pixel_size: int) -> pygame.font.Font:
+        """
+        Retorna a fonte com o tamanho em pixels desejado
+        """
+        key = (font_name, pixel_size)
+        font = self.__fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(font_name, pixel_size)
+            self.__fonts[key] = font
+        return font
+
+    def get_glyph(self, font_name: str, pixel_size: int, character: str, color, background_color) -> pygame.Surface:
+        """
+        Retorna a superficie de um único caractere renderizado
+        """
+        key = (font_name, pixel_size, character, color, background_color)
+        glyph = self.__glyphs.get(key)
+        if glyph is None:
+            glyph = self.get_font(font_name, pixel_size).render(character, True, color, background_color)
+            self.__glyphs[key] = glyph
+        return glyph
+
+    def render_from_glyphs(self, font_name: str, pixel_size: int, text: str, color, background_color) -> pygame.Surface:
+        """
+        Monta o texto a partir dos glifos armazenados, sem renderizar a string inteira novamente.
+        O espaçamento entre pares de caracteres (kerning) é ignorado, por isso é indicado para
+        números e outros textos que mudam com frequência
+        """
+        glyphs = [self.get_glyph(font_name, pixel_size, character, color, background_color) for character in text]
+        width = sum(glyph.get_width() for glyph in glyphs)
+        height = self.get_font(font_name, pixel_size).get_height()
+        if background_color is None:
+            surface = pygame.Surface((max(1, width), height), pygame.SRCALPHA)
+            surface.fill((0, 0, 0, 0))
+            #Os glifos não se sobrepõem, então o máximo copia os pixels e a transparencia sem misturar com o fundo vazio
+            flags = pygame.BLEND_RGBA_MAX
+        else:
+            surface = pygame.Surface((max(1, width), height))
+            surface.fill(background_color)
+            flags = 0
+        x = 0
+        for glyph in glyphs:
+            surface.blit(glyph, (x, 0), special_flags=flags)
+            x += glyph.get_width()
+        return surface
+
+    def get_glyph_count(self) -> int:
+        """
+        Retorna o número de glifos armazenados
+        """
+        return len(self.__glyphs)
 
 class TextRenderer(RenderComponent):
     """
-    Esta classe é utilizada para renderizar texto
+    Esta classe é utilizada para renderizar texto.
+    A superficie só é renderizada novamente quando o texto ou o estilo mudam
     """
 
     def __init__(self):
@@ -471,6 +1078,10 @@ class TextRenderer(RenderComponent):
         self.__screen_width = 0
         self.__screen_height = 0
         self.__font = None
+        self.__font_name = None
+        self.__font_pixel_size = 0
+        self.__font_registry = None
+        self.__use_glyph_cache = False
         self.__font_color = (255, 255, 255)
         self.__transform = None
         self.__display = None
@@ -482,6 +1093,7 @@ class TextRenderer(RenderComponent):
         self.__screen_height = self.get_owner().get_application().get_display().get_height()
         self.__transform = self.get_owner().get_transform()
         self.__display = self.get_owner().get_application().get_display()
+        self.__font_registry = self.get_owner().get_application().get_font_registry()
         self.set_font('Arial', 2)
         self.set_text('default')
 
@@ -499,8 +1111,36 @@ class TextRenderer(RenderComponent):
         """
         Essa função altera o texto que sera exibido na tela
         """
+        if text == self.__text:
+            return
         self.__text = text
-        self.__text_surface = self.__font.render(self.__text, True, self.__font_color, self.__background_color)
+        self.__render()
+
+    def get_text(self) -> str:
+        """
+        Retorna o texto exibido
+        """
+        return self.__text
+
+    def set_glyph_cache(self, enabled: bool):
+        """
+        Quando ativado, o texto é montado a partir de glifos compartilhados em vez de ser renderizado por completo.
+        Indicado para textos que mudam com frequencia, como a pontuação
+        """
+        self.__use_glyph_cache = enabled
+        self.__render()
+
+    def __render(self):
+        """
+        Renderiza a superficie do texto atual
+        """
+        if self.__text is None or self.__font is None:
+            return
+        if self.__use_glyph_cache:
+            self.__text_surface = self.__font_registry.render_from_glyphs(self.__font_name, self.__font_pixel_size,
+            self.__text, self.__font_color, self.__background_color)
+        else:
+            self.__text_surface = self.__font.render(self.__text, True, self.__font_color, self.__background_color)
         self.__half_dimensions.x = self.__text_surface.get_width()/2
         self.__half_dimensions.y = self.__text_surface.get_height()/2
 
@@ -514,22 +1154,37 @@ class TextRenderer(RenderComponent):
         """
         Seleciona uma fonte especifica com um tamanho definido
         """
-        self.__font = pygame.font.SysFont(font_name, int(font_size*self.__screen_width/100))
+        self.__font_name = font_name
+        self.__font_pixel_size = int(font_size*self.__screen_width/100)
+        self.__font = self.__font_registry.get_font(self.__font_name, self.__font_pixel_size)
+        self.__render()
 
     def set_font_color(self, font_color):
         """
         Altera a cor da fonte
         """
-        self.__font_color = font_color
+        font_color = tuple(font_color)
+        if font_color != self.__font_color:
+            self.__font_color = font_color
+            self.__render()
 
     def set_background_color(self, background_color):
         """
         Altera a cor de fundo
         """
-        self.__background_color = background_color
+        if background_color is not None:
+            background_color = tuple(background_color)
+        if background_color != self.__background_color:
+            self.__background_color = background_color
+            self.__render()
+
+    def get_screen_bounds(self) -> Tuple[float, float, float, float]:
+        position = self.__transform.position
+        return (position.x - self.__half_dimensions.x, position.y - self.__half_dimensions.y,
+        position.x + self.__half_dimensions.x, position.y + self.__half_dimensions.y)
 
     def draw(self):
-        self.__display.blit(self.__text_surface, self.calculate_draw_pos())
+        self.get_application().submit_blit(self.__text_surface, self.calculate_draw_pos())
 
 
 class Button(LogicComponent):
@@ -578,27 +1233,57 @@ class AnimatedSprite(SpriteRenderer):
         self.__sprite_scale = None
         self.__current_sprite = None
         self.__sprite_sequence = None
+        self.__sequence_identifier = None
         self.__frame_duration = 1/60
-        self.__next_frame_time = 0
-        self.__i = 0
-        self.__j = 0
+        self.__start_frame = 0
+
+    def on_component_creation(self):
+        super().on_component_creation()
+        self.__start_frame = self.get_application().get_current_frame()
+
+    def on_enable(self):
+        #Animações reutilizadas recomeçam do primeiro frame
+        self.__start_frame = self.get_application().get_current_frame()
+
+    def get_frame_index(self) -> int:
+        """
+        Retorna o frame atual da animação, calculado a partir dos frames lógicos executados
+        desde o início da animação. Assim a animação avança mesmo quando o componente
+        não é desenhado (ex: fora da tela) e fica parada enquanto o jogo esta pausado
+        """
+        application = self.get_application()
+        elapsed_time = (application.get_current_frame() - self.__start_frame)/application.get_frame_rate()
+        return int(elapsed_time/self.__frame_duration) % len(self.__sprite_sequence)
+
+    def set_frame_duration(self, frame_duration: float):
+        """
+        Altera o tempo, em segundos, que cada frame da animação permanece na tela
+        """
+        self.__frame_duration = frame_duration
 
-    def set_sprite_sequence(self, sprite_list):
+    def set_sprite_sequence(self, sprite_list, identifier: str):
+        """
+        Altera a sequencia de sprites da animação.
+        O identificador é usado para compartilhar os frames rotacionados entre animações,
+        então sequencias diferentes devem utilizar identificadores diferentes
+        """
         self.__sprite_sequence = sprite_list
+        self.__sequence_identifier = identifier
         self.__sprite_scale = Vector2(1,1)
+
+    def get_screen_bounds(self) -> Tuple[float, float, float, float]:
+        frame = self.__sprite_sequence[self.get_frame_index()]
+        position = self.get_owner().get_transform().position
+        radius = math.hypot(frame.get_width(), frame.get_height())/2
+        return (position.x - radius, position.y - radius, position.x + radius, position.y + radius)
     
     def draw(self):
-        
-        if time.time() >= self.__next_frame_time and not self.get_owner().get_application().get_pause_state():
-            self.__next_frame_time = time.time() + self.__frame_duration
-            self.__i += 1
-            if self.__i == len(self.__sprite_sequence):
-                self.__i = 0
-                self.__j += 1
-
-        half_size = Vector2(self.__sprite_sequence[self.__i].get_width(), self.__sprite_sequence[self.__i].get_height())*0.5
-        self.get_owner().get_application().get_display().blit(self.__sprite_sequence[self.__i],
-        self.get_owner().get_transform().position - half_size)
+        frame_index = self.get_frame_index()
+        frame = self.__sprite_sequence[frame_index]
+        frame = self.get_rotated_surface((self.__sequence_identifier, frame_index, frame.get_size()),
+        frame, self.get_draw_rotation())
+        x, y = self.get_draw_coordinates()
+        self.get_application().submit_blit(frame, (x - frame.get_width()*0.5, y - frame.get_height()*0.5))
 
 class ShipController(LogicComponent):
 
@@ -664,7 +1349,7 @@ class ShipController(LogicComponent):
         self.calculate_velocity()
         self.enforce_bounds()
     
-    def on_collision_enter(self, other, contact_point, relative_velocity):
+    def on_collision_enter(self, other, contact_point, normal):
         self.__sound_manager.play_sound('big_explosion', 0.1)
         self.explode()
 
@@ -691,6 +1376,13 @@ class GameObject(Object):
         self.__logic_components = list()
         self.__render_components = list()
         self.__data_components = list()
+        #Indices para busca de componentes em tempo constante: cada componente é registrado
+        #em todas as classes da sua hierarquia e pelo seu id
+        self.__components_by_class: Dict[Type, List[Component]] = dict()
+        self.__components_by_id: Dict[int, Component] = dict()
+        self.__world = None
+        self.__entity = None
+        self.__draw_order: List[RenderComponent] = None
         self.__active = True
         self.__application = None
         self.__transform = self.add_component(Transform)
@@ -764,16 +1456,17 @@ class GameObject(Object):
             if i == current_layer:
                 sorting_layer.remove(component)
 
+        self.__draw_order = None
         return target_layer
 
-    def broadcast_collision_to_components(self, other: "Collider", point: Vector2, relative_velocity: Vector2):
+    def broadcast_collision_to_components(self, other: "Collider", point: Vector2, normal: Vector2):
         """
         Este método chama a função "on_collision_enter" de todos os componentes lógicos assim que uma colisão
         for detectada envolvendo esse GameObject
         """
         try:
             for logic_component in self.__logic_components:
-                logic_component.on_collision_enter(other, point, relative_velocity)
+                logic_component.on_collision_enter(other, point, normal)
         except AttributeError:
             return
     def update(self):
@@ -794,8 +1487,14 @@ class GameObject(Object):
         """
         Executa a função draw de todos os componentes gráficos de forma sequencial
         """
-        for sorting_layer in self.__sorting_layers[::-1]:
-            for component in sorting_layer:
+        draw_order = self.__draw_order
+        if draw_order is None:
+            #A ordem de desenho só é recalculada quando as sorting layers mudam
+            draw_order = [component for sorting_layer in self.__sorting_layers[::-1] for component in sorting_layer]
+            self.__draw_order = draw_order
+        application = self.__application
+        for component in draw_order:
+            if not application.cull_render_component(component):
                 component.draw()
 
     def toggle_state(self):
@@ -831,13 +1530,66 @@ class GameObject(Object):
         elif issubclass(type(new_component), RenderComponent):
             self.__render_components.append(new_component)
             self.__sorting_layers[0].append(new_component)
+            self.__draw_order = None
         elif issubclass(type(new_component), DataComponent):
             self.__data_components.append(new_component)
         else:
             raise Exception("Objetos do tipo {} não".format(type(new_component)) +
         "são componentes válidos e não podem ser adicionados a um GameObject")
+        self.__index_component(new_component)
+        if self.__world is not None and not self.__world.has_component(self.__entity, type(new_component)):
+            self.__world.add_component(self.__entity, new_component)
         return new_component
 
+    def get_components(self) -> List[Component]:
+        """
+        Retorna todos os componentes deste GameObject
+        """
+        return self.__logic_components + self.__render_components + self.__data_components
+
+    def set_entity(self, world, entity: int):
+        """
+        Associa este GameObject a uma entidade do World da camada ECS.
+        Essa função não deve ser chamada pelo usuario.
+        """
+        self.__world = world
+        self.__entity = entity
+
+    def get_entity(self) -> int:
+        """
+        Retorna a entidade que espelha este GameObject na camada ECS, ou None
+        """
+        return self.__entity
+
+    def __index_component(self, component: Component):
+        """
+        Registra o componente nos indices de busca por classe e por id
+        """
+        components_by_class = self.__components_by_class
+        for component_class in type(component).__mro__:
+            if component_class is Component:
+                break
+            class_components = components_by_class.get(component_class)
+            if class_components is None:
+                components_by_class[component_class] = [component]
+            else:
+                class_components.append(component)
+        self.__components_by_id[component.get_id()] = component
+
+    def __unindex_component(self, component: Component):
+        """
+        Remove o componente dos indices de busca
+        """
+        components_by_class = self.__components_by_class
+        for component_class in type(component).__mro__:
+            if component_class is Component:
+                break
+            class_components = components_by_class[component_class]
+            class_components.remove(component)
+            if not class_components:
+                del components_by_class[component_class]
+        del self.__components_by_id[component.get_id()]
+
     def __get_search_space(self, component_class:Type) -> List[Component]:
         """
         Função auxiliar que retorna uma lista com base no tipo do componente
@@ -860,15 +1612,17 @@ class GameObject(Object):
         component_id é um parametro opcional,
         quando for diferente de None a busca sera feita pelo id
         """
-        search_space: List[Component] = self.__get_search_space(component_class)
-
-        for component in search_space:
-            if component_id is not None:
-                if component.get_id() == component_id:
-                    return component
-            else:
-                if isinstance(component, component_class):
-                    return component
+        if component_id is not None:
+            component = self.__components_by_id.get(component_id)
+            if component is not None and isinstance(component, component_class):
+                return component
+        else:
+            class_components = self.__components_by_class.get(component_class)
+            if class_components is not None:
+                return class_components[0]
+        #Mantem o erro para classes que não são componentes
+        self.__get_search_space(component_class)
+        return None
 
     def remove_component(self, component_class: Type, component_id: int=None):
         """
@@ -876,29 +1630,42 @@ class GameObject(Object):
         Se o id for diferente de None a busca sera realizada pelo id.
         """
         search_space: List[Component] = self.__get_search_space(component_class)
+        component = self.get_component(component_class, component_id)
+        if component is None:
+            return
 
-        def delete_component(component: Component):
-            search_space.remove(component)
-            if issubclass(type(component), RenderComponent):
-                layer = component.get_sorting_layer_index()
-                self.__sorting_layers[layer].remove(component)
-            component.on_component_removal()
-            del component
-
-        for component in search_space:
-            if component_id is not None:
-                if component.get_id() == component_id:
-                    delete_component(component)
-                    return
-            else:
-                if isinstance(component, component_class):
-                    delete_component(component)
-                    return
+        search_space.remove(component)
+        self.__unindex_component(component)
+        if self.__world is not None:
+            self.__update_world_component(type(component))
+        if issubclass(type(component), RenderComponent):
+            layer = component.get_sorting_layer_index()
+            self.__sorting_layers[layer].remove(component)
+            self.__draw_order = None
+        component.on_component_removal()
+
+    def __update_world_component(self, component_type: Type):
+        """
+        Atualiza a entidade do World após a remoção de um componente.
+        O World guarda apenas um componente por classe, então outro da mesma classe assume o seu lugar se existir
+        """
+        replacement = None
+        for component in self.__components_by_class.get(component_type, ()):
+            if type(component) is component_type:
+                replacement = component
+                break
+        if replacement is None:
+            self.__world.remove_component(self.__entity, component_type)
+        else:
+            self.__world.add_component(self.__entity, replacement)
 
     def destroy(self):
         """
         Essa função destroi todos os componentes deste GameObject
         """
+        if self.__world is not None:
+            self.__world.destroy_entity(self.__entity)
+            self.__world = None
         for cp in self.__logic_components:
             cp.on_component_removal()
         
@@ -910,4 +1677,6 @@ class GameObject(Object):
 
         del self.__logic_components
         del self.__render_components
-        del self.__data_components
\ No newline at end of file
+        del self.__data_components
+        self.__components_by_class.clear()
+        self.__components_by_id.clear()
\ No newline at end of file
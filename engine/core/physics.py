@@ -1,16 +1,33 @@
 import math
+import bisect
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type
 from pygame.math import Vector2
 import pygame
+try:
+    import numpy as np
+except ImportError:
+    np = None
 from engine.core.objects import LogicComponent, Rigidbody, Object, SpriteRenderer
-from engine.core.utilities import cast_to_int_vector, line_circle_intersection_test, scale_number_with_meter
+from engine.core.utilities import cast_to_int_vector, oriented_box_circle_intersection, scale_number_with_meter
+
+DEFAULT_COLLISION_LAYER = 1
+ALL_COLLISION_LAYERS = 0xFFFFFFFF
 
 class Collider(LogicComponent):
     """
     Todos os colisores devem herdar esta classe
+    collision_layer: bits que identificam as camadas as quais o colisor pertence
+    collision_mask: bits das camadas com as quais o colisor pode colidir
+    continuous_collision: quando verdadeiro o colisor é testado ao longo de todo o
+    deslocamento feito no frame lógico, evitando que objetos rapidos atravessem outros
     """
     def __init__(self):
         super().__init__()
         self.rigid_body = None
+        self.collision_layer = DEFAULT_COLLISION_LAYER
+        self.collision_mask = ALL_COLLISION_LAYERS
+        self.continuous_collision = False
 
     def on_component_creation(self):
         self.rigid_body = self.get_owner().get_component(Rigidbody)
@@ -18,6 +35,25 @@ class Collider(LogicComponent):
     def on_component_removal(self):
         self.get_owner().get_application().get_physic_manager().remove_collider(self)
 
+    def on_enable(self):
+        self.get_owner().get_application().get_physic_manager().register_collider(self)
+
+    def on_disable(self):
+        self.get_owner().get_application().get_physic_manager().remove_collider(self)
+
+    def can_collide_with(self, other: "Collider") -> bool:
+        """
+        Retorna verdadeiro se as camadas e mascaras dos dois colisores permitem a colisão
+        """
+        return bool(self.collision_layer & other.collision_mask and other.collision_layer & self.collision_mask)
+
+    def get_bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Retorna a caixa alinhada aos eixos que envolve o colisor no formato
+        (min_x, min_y, max_x, max_y), ou None se ela ainda não for conhecida
+        """
+        return None
+
 class CircleCollider(Collider):
     """
     Este componente representa a forma geométrica de um circulo que pode se
@@ -29,21 +65,32 @@ class CircleCollider(Collider):
         super().__init__()
         self.radius = 50
         self.center = None
+        self.previous_center = None
     def update(self):
         self.center = self.get_owner().get_transform().position
 
     def on_component_creation(self):
         super().on_component_creation()
         self.center = self.get_owner().get_transform().position
+        self.previous_center = Vector2(self.center)
 
     def on_enable(self):
-        self.get_owner().get_application().get_physic_manager().register_collider(self)
-
-    def on_disable(self):
-        self.get_owner().get_application().get_physic_manager().remove_collider(self)
+        #O objeto pode ter sido movido enquanto estava desativado, então o deslocamento anterior é descartado
+        self.center = self.get_owner().get_transform().position
+        self.previous_center = Vector2(self.center)
+        super().on_enable()
 
-    def on_component_removal(self):
-        self.get_owner().get_application().get_physic_manager().remove_collider(self)
+    def get_bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        if self.center is None:
+            return None
+        if self.continuous_collision and self.previous_center is not None:
+            #A caixa cobre todo o deslocamento feito no frame lógico
+            return (min(self.center.x, self.previous_center.x) - self.radius,
+            min(self.center.y, self.previous_center.y) - self.radius,
+            max(self.center.x, self.previous_center.x) + self.radius,
+            max(self.center.y, self.previous_center.y) + self.radius)
+        return (self.center.x - self.radius, self.center.y - self.radius,
+        self.center.x + self.radius, self.center.y + self.radius)
 
 #Este componente deve ser utilizado em conjunto com um SpriteRenderer
 class RectCollider(Collider):
@@ -56,6 +103,8 @@ class RectCollider(Collider):
         self.top_right = None
         self.bottom_right = None
         self.bottom_left = None
+        self.forward_vector = None
+        self.right_vector = None
 
     def on_component_creation(self):
         super().on_component_creation()
@@ -71,6 +120,331 @@ class RectCollider(Collider):
         self.top_right = self.center + fwd_vec*self.height/2 + rgt_vec*self.width/2
         self.bottom_right = self.center - fwd_vec*self.height/2 + rgt_vec*self.width/2
         self.bottom_left = self.center - fwd_vec*self.height/2 - rgt_vec*self.width/2
+        self.forward_vector = fwd_vec
+        self.right_vector = rgt_vec
+
+    def get_bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        if self.center is None or self.right_vector is None:
+            return None
+        #A caixa é calculada a partir do centro atual, o mesmo utilizado pela fase estreita
+        extent_x = (abs(self.right_vector.x)*self.width + abs(self.forward_vector.x)*self.height)/2
+        extent_y = (abs(self.right_vector.y)*self.width + abs(self.forward_vector.y)*self.height)/2
+        return (self.center.x - extent_x, self.center.y - extent_y,
+        self.center.x + extent_x, self.center.y + extent_y)
+
+class BroadPhase(Object):
+    """
+    Classe base das fases amplas (broad phase) de detecção de colisão.
+    A fase ampla seleciona os pares de colisores que podem estar se intersectando,
+    apenas esses pares são enviados para a fase estreita (process_intersection).
+    As subclasses implementam uma estrutura de busca (build, query e move) e find_pairs
+    a percorre na mesma ordem do teste de todos os pares.
+    Subclasses que substituem find_pairs não precisam implementar a estrutura de busca
+    """
+
+    def register_collider(self, collider: Collider):
+        """
+        Chamado sempre que um colisor é adicionado ao PhysicManager
+        """
+
+    def remove_collider(self, collider: Collider):
+        """
+        Chamado sempre que um colisor é removido do PhysicManager
+        """
+
+    def build(self, collider_list: List[Collider], bounds_list: List[Optional[Tuple[float, float, float, float]]]):
+        """
+        Monta a estrutura de busca com as caixas envolventes do início do passo.
+        Os colisores são identificados pelo seu indice na lista; colisores sem caixa (None) são ignorados
+        """
+
+    def query(self, bounds: Tuple[float, float, float, float]) -> Iterable[int]:
+        """
+        Retorna os indices dos colisores cujas caixas podem se sobrepor à caixa fornecida.
+        O resultado pode conter indices a mais ou repetidos, eles são descartados por find_pairs
+        """
+
+    def move(self, index: int, old_bounds: Optional[Tuple[float, float, float, float]],
+    new_bounds: Optional[Tuple[float, float, float, float]]):
+        """
+        Atualiza a estrutura de busca quando a fase estreita move um colisor durante o passo
+        """
+
+    def find_pairs(self, collider_list: List[Collider]) -> Iterable[Tuple[Collider, Collider]]:
+        """
+        Retorna os pares de colisores que devem ser testados neste frame lógico.
+        Os pares seguem a ordem da lista de colisores, como no teste de todos os pares,
+        para que as colisões sejam resolvidas na mesma ordem.
+        Os pares são gerados um de cada vez: depois que a fase estreita processa um par, as caixas
+        dos dois colisores são recalculadas e, se algum deles foi movido pela correção de posição,
+        a estrutura é atualizada e o colisor é testado novamente contra os vizinhos da sua nova posição.
+        Assim as colisões encontradas são as mesmas do teste de todos os pares, exceto quando
+        um callback de colisão move diretamente um terceiro colisor.
+        Pares cujas camadas e mascaras não permitem a colisão não são retornados
+        """
+        collider_list = list(collider_list)
+        bounds_list = [collider.get_bounds() for collider in collider_list]
+        self.build(collider_list, bounds_list)
+        count = len(collider_list)
+        unbounded = [index for index, bounds in enumerate(bounds_list) if bounds is None]
+
+        for i in range(count):
+            collider_a = collider_list[i]
+            bounds_a = bounds_list[i]
+            if bounds_a is None:
+                #Colisores sem caixa envolvente conhecida são testados contra todos os outros
+                candidates = set(range(i+1, count))
+            else:
+                min_x, min_y, max_x, max_y = bounds_a
+                candidates = set()
+                for j in self.query(bounds_a):
+                    if j > i:
+                        bounds_b = bounds_list[j]
+                        if bounds_b[0] <= max_x and min_x <= bounds_b[2] and bounds_b[1] <= max_y and min_y <= bounds_b[3]:
+                            candidates.add(j)
+                for j in unbounded:
+                    if j > i:
+                        candidates.add(j)
+                if not candidates:
+                    continue
+            heap = list(candidates)
+            heapq.heapify(heap)
+
+            while heap:
+                j = heapq.heappop(heap)
+                collider_b = collider_list[j]
+                bounds_b = bounds_list[j]
+                if (bounds_a is not None and bounds_b is not None
+                and not (bounds_a[0] <= bounds_b[2] and bounds_b[0] <= bounds_a[2]
+                and bounds_a[1] <= bounds_b[3] and bounds_b[1] <= bounds_a[3])):
+                    continue
+                if not collider_a.can_collide_with(collider_b):
+                    continue
+
+                yield collider_a, collider_b
+
+                new_bounds = collider_b.get_bounds()
+                if new_bounds != bounds_b:
+                    self.move(j, bounds_b, new_bounds)
+                    bounds_list[j] = new_bounds
+                new_bounds = collider_a.get_bounds()
+                if new_bounds != bounds_a:
+                    self.move(i, bounds_a, new_bounds)
+                    bounds_list[i] = bounds_a = new_bounds
+                    if bounds_a is not None:
+                        for k in self.query(bounds_a):
+                            if k > j and k not in candidates:
+                                candidates.add(k)
+                                heapq.heappush(heap, k)
+
+class AllPairsBroadPhase(BroadPhase):
+    """
+    Testa todos os colisores contra todos os outros colisores
+    """
+
+    def find_pairs(self, collider_list: List[Collider]) -> Iterable[Tuple[Collider, Collider]]:
+        collider_list = list(collider_list)
+        for i, collider_a in enumerate(collider_list):
+            for j in range(i+1, len(collider_list)):
+                collider_b = collider_list[j]
+                if collider_a.collision_layer & collider_b.collision_mask and collider_b.collision_layer & collider_a.collision_mask:
+                    yield collider_a, collider_b
+
+class SpatialHashBroadPhase(BroadPhase):
+    """
+    Divide o espaço em uma grade uniforme e distribui os colisores nas células
+    que a caixa envolvente de cada um ocupa. Apenas colisores que compartilham
+    alguma célula são enviados para a fase estreita.
+    """
+
+    def __init__(self, cell_size_in_meters: float = 10.0):
+        super().__init__()
+        self.__cell_size_in_meters = cell_size_in_meters
+        self.__cell_size = None
+        self.__cells: Dict[Tuple[int, int], List[int]] = dict()
+        self.__cell_ranges: List[Optional[Tuple[int, int, int, int]]] = list()
+
+    def get_cell_size(self) -> float:
+        """
+        Retorna o tamanho de uma célula da grade em pixels
+        """
+        if self.__cell_size is None:
+            self.__cell_size = scale_number_with_meter(self.__cell_size_in_meters)
+        return self.__cell_size
+
+    def get_cell_range(self, bounds: Tuple[float, float, float, float]) -> Tuple[int, int, int, int]:
+        """
+        Retorna as células (primeira x, primeira y, última x, última y) ocupadas pela caixa
+        """
+        cell_size = self.get_cell_size()
+        return (math.floor(bounds[0]/cell_size), math.floor(bounds[1]/cell_size),
+        math.floor(bounds[2]/cell_size), math.floor(bounds[3]/cell_size))
+
+    def build(self, collider_list: List[Collider], bounds_list: List[Optional[Tuple[float, float, float, float]]]):
+        self.__cells = dict()
+        self.__cell_ranges = [None if bounds is None else self.get_cell_range(bounds) for bounds in bounds_list]
+        for index, cell_range in enumerate(self.__cell_ranges):
+            if cell_range is not None:
+                self.__insert(index, cell_range)
+
+    def __insert(self, index: int, cell_range: Tuple[int, int, int, int]):
+        cells = self.__cells
+        for cell_x in range(cell_range[0], cell_range[2] + 1):
+            for cell_y in range(cell_range[1], cell_range[3] + 1):
+                cell = cells.get((cell_x, cell_y))
+                if cell is None:
+                    cells[(cell_x, cell_y)] = [index]
+                else:
+                    cell.append(index)
+
+    def query(self, bounds: Tuple[float, float, float, float]) -> Iterable[int]:
+        cells = self.__cells
+        cell_size = self.__cell_size
+        first_x = math.floor(bounds[0]/cell_size)
+        first_y = math.floor(bounds[1]/cell_size)
+        last_x = math.floor(bounds[2]/cell_size)
+        last_y = math.floor(bounds[3]/cell_size)
+        if first_x == last_x and first_y == last_y:
+            return cells.get((first_x, first_y), ())
+        result = list()
+        for cell_x in range(first_x, last_x + 1):
+            for cell_y in range(first_y, last_y + 1):
+                cell = cells.get((cell_x, cell_y))
+                if cell is not None:
+                    result.extend(cell)
+        return result
+
+    def move(self, index: int, old_bounds: Optional[Tuple[float, float, float, float]],
+    new_bounds: Optional[Tuple[float, float, float, float]]):
+        old_range = self.__cell_ranges[index]
+        new_range = None if new_bounds is None else self.get_cell_range(new_bounds)
+        if old_range == new_range:
+            return
+        self.__cell_ranges[index] = new_range
+        if old_range is not None:
+            for cell_x in range(old_range[0], old_range[2] + 1):
+                for cell_y in range(old_range[1], old_range[3] + 1):
+                    self.__cells[(cell_x, cell_y)].remove(index)
+        if new_range is not None:
+            self.__insert(index, new_range)
+
+class SweepAndPruneBroadPhase(BroadPhase):
+    """
+    Mantém os colisores ordenados pelo eixo x entre os frames lógicos.
+    Como os objetos se movem pouco de um frame para o outro, a lista é
+    reordenada com insertion sort, que é quase linear para listas quase ordenadas.
+    A busca por vizinhos usa busca binária no eixo x e apenas colisores cujos
+    intervalos se sobrepõem nos dois eixos formam pares.
+    Colisores adicionados e removidos são guardados e aplicados de uma vez
+    no início do próximo passo, durante a reordenação.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__sorted_colliders: List[Collider] = list()
+        self.__min_x: List[float] = list()
+        self.__indices: List[int] = list()
+        self.__added_colliders: List[Collider] = list()
+        self.__removed_colliders = set()
+        self.__max_width = 0.0
+
+    def register_collider(self, collider: Collider):
+        if collider in self.__removed_colliders:
+            #O colisor ainda esta na lista, a remoção não foi aplicada
+            self.__removed_colliders.discard(collider)
+        else:
+            self.__added_colliders.append(collider)
+
+    def remove_collider(self, collider: Collider):
+        self.__removed_colliders.add(collider)
+
+    def update_sorted_list(self, collider_list: List[Collider],
+    bounds_list: List[Optional[Tuple[float, float, float, float]]]):
+        """
+        Aplica as adições e remoções pendentes, atualiza o inicio do intervalo x de cada colisor
+        e reordena a lista com insertion sort.
+        Colisores sem caixa envolvente ficam no final da lista e nunca são retornados por query
+        """
+        sorted_colliders = self.__sorted_colliders
+        min_x_list = self.__min_x
+        removed_colliders = self.__removed_colliders
+        if removed_colliders:
+            keep = [k for k, collider in enumerate(sorted_colliders) if collider not in removed_colliders]
+            sorted_colliders[:] = [sorted_colliders[k] for k in keep]
+            min_x_list[:] = [min_x_list[k] for k in keep]
+            self.__added_colliders = [collider for collider in self.__added_colliders
+            if collider not in removed_colliders]
+            removed_colliders.clear()
+
+        order = {collider: index for index, collider in enumerate(collider_list)}
+        for collider in self.__added_colliders:
+            #Inseridos com a posição atual, a reordenação corrige a posição dos demais
+            bounds = bounds_list[order[collider]] if collider in order else None
+            min_x = math.inf if bounds is None else bounds[0]
+            position = bisect.bisect_right(min_x_list, min_x)
+            sorted_colliders.insert(position, collider)
+            min_x_list.insert(position, min_x)
+        self.__added_colliders.clear()
+
+        indices = [order.get(collider, -1) for collider in sorted_colliders]
+        max_width = 0.0
+        for k, index in enumerate(indices):
+            bounds = bounds_list[index] if index >= 0 else None
+            if bounds is None:
+                min_x_list[k] = math.inf
+            else:
+                min_x_list[k] = bounds[0]
+                if bounds[2] - bounds[0] > max_width:
+                    max_width = bounds[2] - bounds[0]
+
+        for i in range(1, len(sorted_colliders)):
+            min_x = min_x_list[i]
+            if min_x_list[i-1] <= min_x:
+                continue
+            collider = sorted_colliders[i]
+            index = indices[i]
+            j = i - 1
+            while j >= 0 and min_x_list[j] > min_x:
+                min_x_list[j+1] = min_x_list[j]
+                sorted_colliders[j+1] = sorted_colliders[j]
+                indices[j+1] = indices[j]
+                j -= 1
+            min_x_list[j+1] = min_x
+            sorted_colliders[j+1] = collider
+            indices[j+1] = index
+
+        self.__indices = indices
+        self.__max_width = max_width
+
+    def build(self, collider_list: List[Collider], bounds_list: List[Optional[Tuple[float, float, float, float]]]):
+        self.update_sorted_list(collider_list, bounds_list)
+
+    def query(self, bounds: Tuple[float, float, float, float]) -> Iterable[int]:
+        #Qualquer intervalo que se sobrepõe à caixa começa no máximo uma largura máxima antes dela
+        first = bisect.bisect_left(self.__min_x, bounds[0] - self.__max_width)
+        last = bisect.bisect_right(self.__min_x, bounds[2])
+        return self.__indices[first:last]
+
+    def move(self, index: int, old_bounds: Optional[Tuple[float, float, float, float]],
+    new_bounds: Optional[Tuple[float, float, float, float]]):
+        min_x_list = self.__min_x
+        indices = self.__indices
+        old_min_x = math.inf if old_bounds is None else old_bounds[0]
+        new_min_x = math.inf if new_bounds is None else new_bounds[0]
+        if new_bounds is not None and new_bounds[2] - new_bounds[0] > self.__max_width:
+            self.__max_width = new_bounds[2] - new_bounds[0]
+        if old_min_x == new_min_x:
+            return
+        position = bisect.bisect_left(min_x_list, old_min_x)
+        while indices[position] != index:
+            position += 1
+        collider = self.__sorted_colliders.pop(position)
+        del min_x_list[position]
+        del indices[position]
+        position = bisect.bisect_right(min_x_list, new_min_x)
+        self.__sorted_colliders.insert(position, collider)
+        min_x_list.insert(position, new_min_x)
+        indices.insert(position, index)
 
 class PhysicManager(Object):
 
@@ -81,86 +455,413 @@ class PhysicManager(Object):
     def __init__(self):
         super().__init__()
         self.__collider_list = list()
+        self.__collider_set = set()
+        self.__broad_phase: BroadPhase = AllPairsBroadPhase()
+        self.__vectorized_circles = False
+        self.__sleep_enabled = False
+        self.__sleep_velocity_threshold = 0.01
+        self.__frames_to_sleep = 30
+        self.__awake_body_count = 0
+        self.__sleeping_body_count = 0
+        self.__island_count = 0
+        self.__collision_handlers: Dict[Tuple[type, type], Callable[[Collider, Collider], None]] = dict()
+        self.__resolved_collision_handlers: Dict[Tuple[type, type], Callable[[Collider, Collider], None]] = dict()
+        self.register_collision_handler(CircleCollider, CircleCollider, self.process_circle_intersection)
+        self.register_collision_handler(RectCollider, CircleCollider, self.process_rect_circle_intersection)
+
+    def set_broad_phase(self, broad_phase: BroadPhase):
+        """
+        Altera o algoritmo utilizado para selecionar os pares de colisores
+        """
+        self.__broad_phase = broad_phase
+        for collider in self.__collider_list:
+            broad_phase.register_collider(collider)
+
+    def get_broad_phase(self) -> BroadPhase:
+        """
+        Retorna o algoritmo utilizado para selecionar os pares de colisores
+        """
+        return self.__broad_phase
+
+    def set_vectorized_circle_collisions(self, enabled: bool):
+        """
+        Ativa ou desativa o processamento vetorizado (NumPy) das colisões entre circulos
+        """
+        if enabled and np is None:
+            raise Exception("O processamento vetorizado das colisões entre circulos depende do NumPy")
+        self.__vectorized_circles = enabled
+
+    def get_vectorized_circle_collisions(self) -> bool:
+        """
+        Retorna se as colisões entre circulos são processadas de forma vetorizada
+        """
+        return self.__vectorized_circles
+
+    def set_sleep_enabled(self, enabled: bool, velocity_threshold: float = 0.01, frames_to_sleep: int = 30):
+        """
+        Ativa ou desativa o sistema de ilhas de contato.
+        Uma ilha cujos corpos ficaram com velocidade abaixo de velocity_threshold (pixels por frame)
+        por frames_to_sleep frames lógicos é colocada para dormir
+        """
+        self.__sleep_enabled = enabled
+        self.__sleep_velocity_threshold = velocity_threshold
+        self.__frames_to_sleep = frames_to_sleep
+        if not enabled:
+            for collider in self.__collider_list:
+                if collider.rigid_body is not None:
+                    collider.rigid_body.wake_up()
+
+    def get_sleep_enabled(self) -> bool:
+        """
+        Retorna se o sistema de ilhas de contato esta ativo
+        """
+        return self.__sleep_enabled
+
+    def get_awake_body_count(self) -> int:
+        """
+        Retorna o número de corpos acordados no último passo de física
+        """
+        return self.__awake_body_count
+
+    def get_sleeping_body_count(self) -> int:
+        """
+        Retorna o número de corpos dormindo no último passo de física
+        """
+        return self.__sleeping_body_count
+
+    def get_island_count(self) -> int:
+        """
+        Retorna o número de ilhas de contato encontradas no último passo de física
+        """
+        return self.__island_count
+
+    def update_islands(self, pairs: List[Tuple[Collider, Collider]]):
+        """
+        Agrupa os corpos em ilhas de contato a partir dos pares da fase ampla cujas caixas envolventes
+        se sobrepõem. Uma ilha em que todos os corpos estão parados é colocada para dormir,
+        qualquer outra ilha é acordada por inteiro
+        """
+        parent = dict()
+
+        def find(collider):
+            root = collider
+            while parent.get(root, root) is not root:
+                root = parent[root]
+            while collider is not root:
+                next_collider = parent[collider]
+                parent[collider] = root
+                collider = next_collider
+            return root
+
+        bounds = {collider: collider.get_bounds() for collider in self.__collider_list}
+        for collider_a, collider_b in pairs:
+            bounds_a = bounds.get(collider_a)
+            bounds_b = bounds.get(collider_b)
+            if (bounds_a is None or bounds_b is None or (bounds_a[0] <= bounds_b[2] and bounds_b[0] <= bounds_a[2]
+            and bounds_a[1] <= bounds_b[3] and bounds_b[1] <= bounds_a[3])):
+                root_a = find(collider_a)
+                root_b = find(collider_b)
+                if root_a is not root_b:
+                    parent[root_b] = root_a
+
+        islands = dict()
+        for collider in self.__collider_list:
+            if collider.rigid_body is not None:
+                islands.setdefault(find(collider), set()).add(collider.rigid_body)
+
+        self.__awake_body_count = 0
+        self.__sleeping_body_count = 0
+        for bodies in islands.values():
+            resting = True
+            for body in bodies:
+                if body.update_rest_frames(self.__sleep_velocity_threshold) < self.__frames_to_sleep:
+                    resting = False
+            for body in bodies:
+                if resting:
+                    if not body.is_sleeping():
+                        body.sleep()
+                else:
+                    body.wake_up()
+            if resting:
+                self.__sleeping_body_count += len(bodies)
+            else:
+                self.__awake_body_count += len(bodies)
+        self.__island_count = len(islands)
 
     def physic_step(self):
         """
         Essa função calcula e resolve todas as colisões a cada frame lógico
         """
-        for i,collider_a in enumerate(self.__collider_list):
-            for j in range(i+1, len(self.__collider_list)):
-                if j == len(self.__collider_list):
-                    continue
-                collider_b = self.__collider_list[j]
+        #Os pares são gerados enquanto as colisões são resolvidas, então as ilhas de contato
+        #são montadas com os pares deste passo e valem para o próximo
+        island_pairs = list() if self.__sleep_enabled else None
+        circle_pairs = list() if self.__vectorized_circles else None
+        for collider_a, collider_b in self.__broad_phase.find_pairs(self.__collider_list):
+            if island_pairs is not None:
+                island_pairs.append((collider_a, collider_b))
+            #Pares em que os dois corpos estão dormindo não mudam de estado
+            if (self.__sleep_enabled and collider_a.rigid_body is not None and collider_a.rigid_body.is_sleeping()
+            and collider_b.rigid_body is not None and collider_b.rigid_body.is_sleeping()):
+                continue
+            if (circle_pairs is not None and isinstance(collider_a, CircleCollider) and isinstance(collider_b, CircleCollider)
+            and not collider_a.continuous_collision and not collider_b.continuous_collision
+            and collider_a.rigid_body is not None and collider_b.rigid_body is not None):
+                circle_pairs.append((collider_a, collider_b))
+                continue
+            #Colisores removidos durante o passo (ex: objetos destruidos em uma colisão) são ignorados
+            if collider_a in self.__collider_set and collider_b in self.__collider_set:
                 self.process_intersection(collider_a, collider_b)
+
+        if circle_pairs:
+            #Colisores removidos pelos callbacks da varredura não entram no lote
+            collider_set = self.__collider_set
+            circle_pairs = [pair for pair in circle_pairs if pair[0] in collider_set and pair[1] in collider_set]
+        if circle_pairs:
+            self.process_circle_intersections_vectorized(circle_pairs)
+
+        if island_pairs is not None:
+            self.update_islands(island_pairs)
+
+        for collider in self.__collider_list:
+            if collider.continuous_collision and collider.center is not None:
+                collider.previous_center = Vector2(collider.center)
+
+    def process_circle_intersections_vectorized(self, pairs: List[Tuple[CircleCollider, CircleCollider]]):
+        """
+        Processa de uma vez, utilizando vetores do NumPy, os pares de circulos selecionados pela fase ampla.
+        physic_step separa esses pares durante a varredura da fase ampla (camadas, mascaras e corpos
+        dormindo já foram verificados) e os processa depois dos demais pares.
+        Todas as correções de posição e impulsos são calculados a partir do mesmo estado
+        e aplicados simultaneamente, ao contrário de process_intersection que resolve um par de cada vez.
+        Colisores com colisão continua são processados individualmente por process_intersection.
+        """
+        circles = list(dict.fromkeys(circle for pair in pairs for circle in pair))
+        indices = {circle: index for index, circle in enumerate(circles)}
+        index_a = np.fromiter((indices[pair[0]] for pair in pairs), dtype=np.intp, count=len(pairs))
+        index_b = np.fromiter((indices[pair[1]] for pair in pairs), dtype=np.intp, count=len(pairs))
+
+        centers = np.array([(circle.center.x, circle.center.y) for circle in circles], dtype=float)
+        radii = np.array([circle.radius for circle in circles], dtype=float)
+        delta = centers[index_a] - centers[index_b]
+        distance = np.hypot(delta[:, 0], delta[:, 1])
+        hits = (distance < radii[index_a] + radii[index_b]) & (distance > 0.0)
+        if not hits.any():
+            return
+
+        index_a = index_a[hits]
+        index_b = index_b[hits]
+        delta = delta[hits]
+        distance = distance[hits]
+
+        velocities = np.array([(circle.rigid_body.velocity.x, circle.rigid_body.velocity.y)
+        for circle in circles], dtype=float)
+        masses = np.array([circle.rigid_body.mass for circle in circles], dtype=float)
+
+        #Correção de posição: cada circulo é afastado metade da sobreposição
+        overlap = 0.5*(distance - radii[index_a] - radii[index_b])
+        shift = delta*(overlap/distance)[:, None]
+        correction = np.zeros_like(centers)
+        np.subtract.at(correction, index_a, shift)
+        np.add.at(correction, index_b, shift)
+        centers += correction
+
+        #Impulso elástico ao longo da normal de contato
+        normal = centers[index_b] - centers[index_a]
+        normal_length = np.hypot(normal[:, 0], normal[:, 1])
+        normal_length[normal_length == 0.0] = 1.0
+        normal /= normal_length[:, None]
+        relative_velocity = velocities[index_a] - velocities[index_b]
+        impulse = 2*np.einsum('ij,ij->i', normal, relative_velocity)/(masses[index_a] + masses[index_b])
+        velocity_change = np.zeros_like(velocities)
+        np.subtract.at(velocity_change, index_a, (impulse*masses[index_b])[:, None]*normal)
+        np.add.at(velocity_change, index_b, (impulse*masses[index_a])[:, None]*normal)
+        velocities += velocity_change
+
+        for index in np.unique(np.concatenate((index_a, index_b))):
+            circle = circles[index]
+            position = circle.get_owner().get_transform().position
+            position.x = float(centers[index, 0])
+            position.y = float(centers[index, 1])
+            circle.center = position
+            circle.rigid_body.velocity.x = float(velocities[index, 0])
+            circle.rigid_body.velocity.y = float(velocities[index, 1])
+
+        for a, b, (nx, ny) in zip(index_a.tolist(), index_b.tolist(), normal.tolist()):
+            collider_a = circles[a]
+            collider_b = circles[b]
+            if collider_a in self.__collider_set and collider_b in self.__collider_set:
+                collider_a.get_owner().broadcast_collision_to_components(collider_b, None, Vector2(nx, ny))
+                collider_b.get_owner().broadcast_collision_to_components(collider_a, None, Vector2(-nx, -ny))
                 
+    def register_collision_handler(self, collider_class_a: Type[Collider], collider_class_b: Type[Collider],
+    handler: Callable[[Collider, Collider], None]):
+        """
+        Registra a função que processa a intersecção entre colisores das classes fornecidas.
+        O par invertido é registrado automaticamente, então a função sempre recebe
+        os colisores na ordem (collider_class_a, collider_class_b).
+        Subclasses de colisores utilizam a função registrada para a classe base mais próxima.
+        """
+        self.__collision_handlers[(collider_class_a, collider_class_b)] = handler
+        if collider_class_a is not collider_class_b:
+            self.__collision_handlers[(collider_class_b, collider_class_a)] = lambda a, b: handler(b, a)
+        self.__resolved_collision_handlers.clear()
+
+    def get_collision_handler(self, collider_class_a: Type[Collider],
+    collider_class_b: Type[Collider]) -> Optional[Callable[[Collider, Collider], None]]:
+        """
+        Retorna a função que processa a intersecção entre as duas classes de colisores.
+        A busca pelas classes base é feita apenas uma vez por par de classes e o resultado é armazenado
+        """
+        key = (collider_class_a, collider_class_b)
+        try:
+            return self.__resolved_collision_handlers[key]
+        except KeyError:
+            pass
+
+        handler = None
+        for base_a in collider_class_a.__mro__:
+            for base_b in collider_class_b.__mro__:
+                handler = self.__collision_handlers.get((base_a, base_b))
+                if handler is not None:
+                    break
+            if handler is not None:
+                break
+        self.__resolved_collision_handlers[key] = handler
+        return handler
+
     def process_intersection(self, collider_a: Collider, collider_b: Collider):
         """
         Essa função processa a intersecção e resolve a colisão para um par de colisores
         """
-        if issubclass(type(collider_a), CircleCollider) and issubclass(type(collider_b), CircleCollider):
-            distance_between_centers = (collider_a.center - collider_b.center).length()
-            if distance_between_centers < collider_a.radius + collider_b.radius:
-                
-                transform_a = collider_a.get_owner().get_transform()
-                transform_b = collider_b.get_owner().get_transform()
+        try:
+            handler = self.__resolved_collision_handlers[(type(collider_a), type(collider_b))]
+        except KeyError:
+            handler = self.get_collision_handler(type(collider_a), type(collider_b))
+        if handler is not None:
+            handler(collider_a, collider_b)
 
-                distance_between = (collider_a.center - collider_b.center).magnitude() 
+    def process_circle_intersection(self, collider_a: CircleCollider, collider_b: CircleCollider):
+        """
+        Este método testa se dois circulos estão se intersectando e resolve a colisão
+        """
+        distance_between_centers = (collider_a.center - collider_b.center).length()
+        hit = distance_between_centers < collider_a.radius + collider_b.radius
+        if not hit and (collider_a.continuous_collision or collider_b.continuous_collision):
+            hit = self.move_circles_to_time_of_impact(collider_a, collider_b)
+        if hit:
+            
+            transform_a = collider_a.get_owner().get_transform()
+            transform_b = collider_b.get_owner().get_transform()
 
-                overlap_distance = 0.5*(distance_between - collider_a.radius - collider_b.radius)
-                transform_a.position.x -= overlap_distance *(collider_a.center.x - collider_b.center.x)/distance_between
-                transform_a.position.y -= overlap_distance *(collider_a.center.y - collider_b.center.y)/distance_between
+            distance_between = (collider_a.center - collider_b.center).magnitude() 
 
-                transform_b.position.x += overlap_distance *(collider_a.center.x - collider_b.center.x)/distance_between
-                transform_b.position.y += overlap_distance *(collider_a.center.y - collider_b.center.y)/distance_between
-                collider_a.center = transform_a.position
-                collider_b.center = transform_b.position
+            overlap_distance = 0.5*(distance_between - collider_a.radius - collider_b.radius)
+            transform_a.position.x -= overlap_distance *(collider_a.center.x - collider_b.center.x)/distance_between
+            transform_a.position.y -= overlap_distance *(collider_a.center.y - collider_b.center.y)/distance_between
 
-                distance_between = (collider_a.center - collider_b.center).magnitude()
+            transform_b.position.x += overlap_distance *(collider_a.center.x - collider_b.center.x)/distance_between
+            transform_b.position.y += overlap_distance *(collider_a.center.y - collider_b.center.y)/distance_between
+            collider_a.center = transform_a.position
+            collider_b.center = transform_b.position
 
-                nx = (collider_b.center.x - collider_a.center.x)/distance_between
-                ny = (collider_b.center.y - collider_a.center.y)/distance_between
+            distance_between = (collider_a.center - collider_b.center).magnitude()
 
-                kx = collider_a.rigid_body.velocity.x - collider_b.rigid_body.velocity.x
-                ky = collider_a.rigid_body.velocity.y - collider_b.rigid_body.velocity.y
-                p = 2 * (nx*kx + ny*ky) / (collider_a.rigid_body.mass + collider_b.rigid_body.mass)
-                collider_a.rigid_body.velocity.x = collider_a.rigid_body.velocity.x - p * collider_b.rigid_body.mass * nx
-                collider_a.rigid_body.velocity.y = collider_a.rigid_body.velocity.y - p * collider_b.rigid_body.mass * ny
-                
-                collider_b.rigid_body.velocity.x = collider_b.rigid_body.velocity.x + p * collider_a.rigid_body.mass * nx
-                collider_b.rigid_body.velocity.y = collider_b.rigid_body.velocity.y + p * collider_a.rigid_body.mass * ny
+            nx = (collider_b.center.x - collider_a.center.x)/distance_between
+            ny = (collider_b.center.y - collider_a.center.y)/distance_between
+
+            kx = collider_a.rigid_body.velocity.x - collider_b.rigid_body.velocity.x
+            ky = collider_a.rigid_body.velocity.y - collider_b.rigid_body.velocity.y
+            p = 2 * (nx*kx + ny*ky) / (collider_a.rigid_body.mass + collider_b.rigid_body.mass)
+            collider_a.rigid_body.velocity.x = collider_a.rigid_body.velocity.x - p * collider_b.rigid_body.mass * nx
+            collider_a.rigid_body.velocity.y = collider_a.rigid_body.velocity.y - p * collider_b.rigid_body.mass * ny
+            
+            collider_b.rigid_body.velocity.x = collider_b.rigid_body.velocity.x + p * collider_a.rigid_body.mass * nx
+            collider_b.rigid_body.velocity.y = collider_b.rigid_body.velocity.y + p * collider_a.rigid_body.mass * ny
+
+            collider_a.get_owner().broadcast_collision_to_components(collider_b, None, Vector2(nx, ny))
+            collider_b.get_owner().broadcast_collision_to_components(collider_a, None, Vector2(-nx, -ny))
 
-                collider_a.get_owner().broadcast_collision_to_components(collider_b, None, None)
-                collider_b.get_owner().broadcast_collision_to_components(collider_a, None, None)
+    def move_circles_to_time_of_impact(self, collider_a: CircleCollider, collider_b: CircleCollider) -> bool:
+        """
+        Testa os circulos ao longo do deslocamento feito desde o último passo de física.
+        Colisores sem colisão continua são considerados parados na posição atual.
+        Se os circulos se tocarem durante o deslocamento, os colisores com colisão continua
+        são movidos para o instante do primeiro contato e o método retorna verdadeiro.
+        """
+        start_a = collider_a.previous_center if collider_a.continuous_collision else collider_a.center
+        start_b = collider_b.previous_center if collider_b.continuous_collision else collider_b.center
+        if start_a is None or start_b is None:
+            return False
 
-        elif (issubclass(type(collider_a), CircleCollider) and issubclass(type(collider_b), RectCollider)):
-            self.process_rect_circle_intersection(collider_b, collider_a)
-        elif (issubclass(type(collider_a), RectCollider) and issubclass(type(collider_b), CircleCollider)):
-            self.process_rect_circle_intersection(collider_a, collider_b)
+        start_x = start_a.x - start_b.x
+        start_y = start_a.y - start_b.y
+        motion_x = (collider_a.center.x - start_a.x) - (collider_b.center.x - start_b.x)
+        motion_y = (collider_a.center.y - start_a.y) - (collider_b.center.y - start_b.y)
+        radius = collider_a.radius + collider_b.radius
+
+        a = motion_x*motion_x + motion_y*motion_y
+        b = 2*(start_x*motion_x + start_y*motion_y)
+        c = start_x*start_x + start_y*start_y - radius*radius
+        if a == 0.0:
+            return False
+        discriminant = b*b - 4*a*c
+        if discriminant < 0.0:
+            return False
+        time_of_impact = (-b - math.sqrt(discriminant))/(2*a)
+        if time_of_impact < 0.0:
+            if c > 0.0:
+                #Os circulos estão se afastando
+                return False
+            time_of_impact = 0.0
+        if time_of_impact > 1.0:
+            return False
+
+        for collider, start in ((collider_a, start_a), (collider_b, start_b)):
+            if collider.continuous_collision:
+                position = collider.get_owner().get_transform().position
+                position.update(start.x + (collider.center.x - start.x)*time_of_impact,
+                start.y + (collider.center.y - start.y)*time_of_impact)
+                collider.center = position
+        return True
 
     def process_rect_circle_intersection(self, rect_collider, circle_collider):
         """
-        Este método testa se um retangulo e um circulo estão se intersectando
+        Este método testa se um retangulo e um circulo estão se intersectando.
+        Cada lado recebe o ponto de contato e a normal unitaria que aponta para o outro colisor
         """
-        cond1  = line_circle_intersection_test(rect_collider.top_left, rect_collider.top_right, circle_collider.center, circle_collider.radius)
-        cond2  = line_circle_intersection_test(rect_collider.top_left, rect_collider.bottom_left, circle_collider.center, circle_collider.radius)
-        cond3  = line_circle_intersection_test(rect_collider.bottom_left, rect_collider.bottom_right, circle_collider.center, circle_collider.radius)
-        cond4  = line_circle_intersection_test(rect_collider.bottom_right, rect_collider.top_right, circle_collider.center, circle_collider.radius)
-        
-        if cond1 or cond2 or cond3 or cond4:
-            rect_collider.get_owner().broadcast_collision_to_components(circle_collider, None, None)
-            circle_collider.get_owner().broadcast_collision_to_components(rect_collider, None, None)
+        if rect_collider.center is None:
+            return
+        contact = oriented_box_circle_intersection(rect_collider.center.x, rect_collider.center.y,
+        rect_collider.right_vector.x, rect_collider.right_vector.y,
+        rect_collider.forward_vector.x, rect_collider.forward_vector.y,
+        rect_collider.width/2, rect_collider.height/2,
+        circle_collider.center.x, circle_collider.center.y, circle_collider.radius)
+
+        if contact is not None:
+            contact_point = Vector2(contact[0], contact[1])
+            normal = Vector2(contact[2], contact[3])
+            rect_collider.get_owner().broadcast_collision_to_components(circle_collider, contact_point, normal)
+            circle_collider.get_owner().broadcast_collision_to_components(rect_collider, Vector2(contact_point), -normal)
 
 
     def register_collider(self, collider: Collider):
         """
         Adiciona um novo colisor a lista de colisores
         """
+        if collider in self.__collider_set:
+            return
         self.__collider_list.append(collider)
-    
+        self.__collider_set.add(collider)
+        self.__broad_phase.register_collider(collider)
+
     def remove_collider(self, collider: Collider):
         """
         Remove o colisor da lista de colisores
         """
+        if collider not in self.__collider_set:
+            return
         self.__collider_list.remove(collider)
+        self.__collider_set.discard(collider)
+        self.__broad_phase.remove_collider(collider)
 
 
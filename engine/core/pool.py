@@ -0,0 +1,145 @@
+"""
+Esse módulo contem o pool de GameObjects, que reaproveita objetos em vez de criá-los e destruí-los
+"""
+
+from typing import Callable, Dict, List
+from engine.core.objects import GameObject, Object
+from engine.core.physics import Collider
+
+
+class GameObjectPool(Object):
+
+    """
+    Esta classe reaproveita GameObjects que são criados e removidos com frequencia, como projéteis.
+    factory adiciona os componentes a um GameObject novo e só é chamada quando não há objetos livres.
+    Objetos livres ficam desativados na aplicação e seus componentes recebem disable(),
+    então os colisores saem do PhysicManager. Ao serem reutilizados os componentes recebem enable().
+    on_acquire recebe o objeto e os argumentos de acquire() e deve reiniciar o seu estado;
+    on_release é chamado quando o objeto volta para o pool.
+    Quando max_size é atingido os objetos devolvidos são removidos da aplicação.
+    O dono do pool deve chamar clear() quando for removido, para que os objetos não fiquem esquecidos na aplicação
+    """
+
+    def __init__(self, application: "Application", factory: Callable[[GameObject], None],
+    on_acquire: Callable[..., None] = None, on_release: Callable[[GameObject], None] = None, max_size: int = 256):
+        super().__init__()
+        self.__application = application
+        self.__factory = factory
+        self.__on_acquire = on_acquire
+        self.__on_release = on_release
+        self.__max_size = max_size
+        self.__free_objects: List[GameObject] = list()
+        self.__objects_in_use: Dict[int, GameObject] = dict()
+        self.__generations: Dict[int, int] = dict()
+
+    def __create(self) -> GameObject:
+        """
+        Cria um novo objeto com a fabrica e o deixa desativado, como se estivesse livre
+        """
+        game_object = self.__application.add_game_object()
+        self.__factory(game_object)
+        game_object.set_state(False)
+        for component in game_object.get_components():
+            component.disable()
+        self.__generations[game_object.get_id()] = 0
+        return game_object
+
+    def acquire(self, *args) -> GameObject:
+        """
+        Retorna um objeto livre, ou um novo objeto se não houver nenhum, já ativado e
+        configurado por on_acquire com os argumentos fornecidos
+        """
+        game_object = self.__free_objects.pop() if self.__free_objects else self.__create()
+        if self.__on_acquire is not None:
+            self.__on_acquire(game_object, *args)
+        for component in game_object.get_components():
+            component.enable()
+        game_object.set_state(True)
+        self.__objects_in_use[game_object.get_id()] = game_object
+        return game_object
+
+    def release(self, game_object: GameObject):
+        """
+        Devolve o objeto ao pool. Devolver um objeto que não esta em uso não tem efeito.
+        Se a aplicação estiver percorrendo os objetos ou colisores, o objeto e os seus colisores são
+        desativados na hora e os demais componentes são desativados no próximo ponto de sincronização
+        """
+        if self.__objects_in_use.pop(game_object.get_id(), None) is None:
+            return
+        self.__generations[game_object.get_id()] += 1
+        if self.__on_release is not None:
+            self.__on_release(game_object)
+        game_object.set_state(False)
+        if self.__application.is_iterating():
+            #Os colisores saem na hora para que o objeto não receba outras colisões neste passo
+            for component in game_object.get_components():
+                if isinstance(component, Collider):
+                    component.disable()
+            self.__application.get_command_buffer().call(self.__store, game_object)
+        else:
+            self.__store(game_object)
+
+    def __store(self, game_object: GameObject):
+        """
+        Desativa os componentes do objeto devolvido e o guarda entre os objetos livres
+        """
+        if game_object.get_id() not in self.__generations:
+            #O pool foi esvaziado depois que o objeto foi devolvido
+            return
+        for component in game_object.get_components():
+            component.disable()
+        if len(self.__free_objects) < self.__max_size:
+            self.__free_objects.append(game_object)
+        else:
+            del self.__generations[game_object.get_id()]
+            self.__application.remove_game_object(game_object)
+
+    def release_after(self, game_object: GameObject, frames: int):
+        """
+        Devolve o objeto ao pool após o número especificado de frames lógicos.
+        Se o objeto for devolvido e reutilizado antes disso o agendamento é ignorado
+        """
+        generation = self.__generations[game_object.get_id()]
+
+        def release_if_same_generation():
+            if self.__generations.get(game_object.get_id()) == generation:
+                self.release(game_object)
+
+        self.__application.enqueue_method(release_if_same_generation, frames)
+
+    def is_in_use(self, game_object: GameObject) -> bool:
+        """
+        Retorna verdadeiro se o objeto foi obtido do pool e ainda não foi devolvido
+        """
+        return game_object.get_id() in self.__objects_in_use
+
+    def get_in_use_count(self) -> int:
+        """
+        Retorna o número de objetos em uso
+        """
+        return len(self.__objects_in_use)
+
+    def get_free_count(self) -> int:
+        """
+        Retorna o número de objetos livres
+        """
+        return len(self.__free_objects)
+
+    def release_all(self):
+        """
+        Devolve todos os objetos em uso ao pool
+        """
+        for game_object in list(self.__objects_in_use.values()):
+            self.release(game_object)
+
+    def clear(self):
+        """
+        Remove da aplicação todos os objetos do pool, livres e em uso.
+        Devoluções agendadas por release_after para esses objetos são ignoradas
+        """
+        game_objects = list(self.__objects_in_use.values()) + self.__free_objects
+        self.__objects_in_use.clear()
+        self.__free_objects.clear()
+        self.__generations.clear()
+        for game_object in game_objects:
+            self.__application.remove_game_object(game_object)
@@ -2,7 +2,7 @@
 Esse método contem apenas funções auxiliares
 """
 import math
-from typing import Tuple
+from typing import Optional, Tuple
 from pygame.math import Vector2
 
 
@@ -66,11 +66,51 @@ def line_circle_intersection_test(line_start: Vector2, line_end: Vector2, center
  
     distance = distance_between_point_and_line(center, line_start, line_end)
     if distance <= radius:
-        print("Sucesso")
         return True
     else:
         return False
 
+def oriented_box_circle_intersection(box_center_x: float, box_center_y: float,
+right_x: float, right_y: float, forward_x: float, forward_y: float,
+half_width: float, half_height: float,
+circle_x: float, circle_y: float, radius: float) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Testa um retangulo orientado contra um circulo no espaço local do retangulo,
+    utilizando apenas operações com floats.
+    right e forward são os eixos unitarios do retangulo.
+    Retorna (contato_x, contato_y, normal_x, normal_y) ou None se não houver intersecção.
+    O ponto de contato é o ponto do retangulo mais proximo do centro do circulo
+    e a normal aponta do retangulo para o circulo.
+    """
+    dx = circle_x - box_center_x
+    dy = circle_y - box_center_y
+    local_x = dx*right_x + dy*right_y
+    local_y = dx*forward_x + dy*forward_y
+
+    closest_x = min(max(local_x, -half_width), half_width)
+    closest_y = min(max(local_y, -half_height), half_height)
+    offset_x = local_x - closest_x
+    offset_y = local_y - closest_y
+    distance_squared = offset_x*offset_x + offset_y*offset_y
+    if distance_squared > radius*radius:
+        return None
+
+    if distance_squared > 0.0:
+        distance = math.sqrt(distance_squared)
+        normal_x = offset_x/distance
+        normal_y = offset_y/distance
+    elif half_width - abs(local_x) < half_height - abs(local_y):
+        #O centro do circulo esta dentro do retangulo, a normal segue o eixo de menor penetração
+        normal_x = math.copysign(1.0, local_x)
+        normal_y = 0.0
+    else:
+        normal_x = 0.0
+        normal_y = math.copysign(1.0, local_y)
+
+    contact_x = box_center_x + closest_x*right_x + closest_y*forward_x
+    contact_y = box_center_y + closest_x*right_y + closest_y*forward_y
+    return (contact_x, contact_y, normal_x*right_x + normal_y*forward_x, normal_x*right_y + normal_y*forward_y)
+
 def is_point_inside_circle(point: Vector2, center: Vector2, radius: Vector2) -> bool:
     """
     Esta função checa se um ponto esta dentro de um circulo
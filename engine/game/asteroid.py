@@ -2,58 +2,82 @@ import time
 from pygame.math import Vector2
 from engine.core.objects import SpriteRenderer, Rigidbody, Transform, LogicComponent, GameObject, AnimatedSprite
 from engine.core.physics import CircleCollider
+from engine.core.pool import GameObjectPool
 from engine.core.utilities import scaled_vector, scaled_number
+from engine.game.collision_layers import ASTEROID_LAYER, ASTEROID_MASK
 import random
 
+#Os asteroides são arredondados para tamanhos múltiplos deste valor (em pixels)
+#para que compartilhem as mesmas superficies redimensionadas e rotacionadas
+ASTEROID_SIZE_CLASS_STEP = 8
+
+#A animação de explosão mantém o tamanho original dos frames (256x256) e é reduzida para este número de frames,
+#mantendo a mesma duração da animação original de 254 frames a 60 quadros por segundo
+EXPLOSION_FRAME_COUNT = 64
+EXPLOSION_DURATION = 254/60
+#Número de frames lógicos que uma explosão permanece no jogo
+EXPLOSION_LIFETIME = 240
+
 class AsteroidManagerScript(LogicComponent):
     """
-    Esta classe é responsável por gerenciar os asteroids do jogo
+    Esta classe é responsável por gerenciar os asteroids do jogo.
+    Os asteroides são reaproveitados por um GameObjectPool
     """
     def __init__(self):
         super().__init__()
-        self.__asteroid_list = list()
+        self.__pool = None
+
+    def on_component_creation(self):
+        self.__pool = GameObjectPool(self.get_owner().get_application(), self.build_asteroid, self.reset_asteroid)
 
     def get_asteroid_count(self):
-        return len(self.__asteroid_list)
+        return self.__pool.get_in_use_count()
 
-    def instantiate_asteroid(self, size_in_meters: float, initial_position: Vector2, initial_velocity: Vector2):
+    def build_asteroid(self, asteroid_game_object: GameObject):
         """
-        Cria uma novo asteroid
+        Adiciona os componentes de um asteroide a um GameObject novo
         """
-        app = self.get_owner().get_application()
-        asteroid_game_object = app.add_game_object()
         asteroid_game_object.set_sorting_layer_index(1)
-        asteroid_game_object.get_transform().position = initial_position
-        asteroid_rigid_body = asteroid_game_object.add_component(Rigidbody)
-        asteroid_rigid_body.velocity = scaled_vector(initial_velocity)
-        asteroid_rigid_body.mass = size_in_meters
-        asteroid_rigid_body.angular_velocity = random.random()/60
+        asteroid_game_object.add_component(Rigidbody)
         asteroid_sprite_renderer = asteroid_game_object.add_component(SpriteRenderer)
         asteroid_sprite_renderer.set_new_sprite('asteroid')
-        asteroid_sprite_renderer.set_sprite_scale_in_meters(size_in_meters)
-        radius = asteroid_sprite_renderer.sprite.get_width()/2
         asteroid_collider = asteroid_game_object.add_component(CircleCollider)
-        asteroid_collider.radius = radius
+        asteroid_collider.collision_layer = ASTEROID_LAYER
+        asteroid_collider.collision_mask = ASTEROID_MASK
         script = asteroid_game_object.add_component(AsteroidScript)
         script.asteroid_manager = self
-        self.__asteroid_list.append(asteroid_game_object)
+
+    def reset_asteroid(self, asteroid_game_object: GameObject, size_in_meters: float, initial_position: Vector2, initial_velocity: Vector2):
+        """
+        Reinicia o estado de um asteroide obtido do pool
+        """
+        asteroid_game_object.get_transform().position = initial_position
+        asteroid_game_object.get_transform().rotation = 0.0
+        asteroid_rigid_body = asteroid_game_object.get_component(Rigidbody)
+        asteroid_rigid_body.velocity = scaled_vector(initial_velocity)
+        asteroid_rigid_body.mass = size_in_meters
+        asteroid_rigid_body.angular_velocity = random.random()/60
+        asteroid_sprite_renderer = asteroid_game_object.get_component(SpriteRenderer)
+        asteroid_sprite_renderer.set_sprite_scale_in_meters(size_in_meters, ASTEROID_SIZE_CLASS_STEP)
+        asteroid_game_object.get_component(CircleCollider).radius = asteroid_sprite_renderer.sprite.get_width()/2
+
+    def instantiate_asteroid(self, size_in_meters: float, initial_position: Vector2, initial_velocity: Vector2):
+        """
+        Cria uma novo asteroid
+        """
+        self.__pool.acquire(size_in_meters, initial_position, initial_velocity)
 
     def remove_asteroid(self, asteroid: GameObject):
         """
         Remove um asteroid especifico
         """
-        self.__asteroid_list.remove(asteroid)
-        self.get_owner().get_application().remove_game_object(asteroid)
+        self.__pool.release(asteroid)
 
     def remove_all_asteroids(self):
         """
         Remove todos os asteroids
         """
-        id_list = [gm.get_id() for gm in self.__asteroid_list]
-
-        for gm_id in id_list:
-            self.get_owner().get_application().remove_game_object_by_id(gm_id)
-        self.__asteroid_list.clear()
+        self.__pool.release_all()
 
 class AsteroidScript(LogicComponent):
     """
@@ -98,42 +122,48 @@ class AsteroidScript(LogicComponent):
         """
         Explode o asteroid
         """
+        if not self.get_owner().get_state():
+            #O asteroide ja explodiu e voltou para o pool
+            return
         self.__sound_manager.play_sound('comet_explosion', 1)
         params = dict()
         params['position'] = self.get_owner().get_transform().position
         params['score'] = 100*self.__rb.velocity.magnitude()/self.__rb.mass
         self.__evt_system.fire_event('CometExplosion', params)
-        self.get_owner().get_application().remove_game_object(self.get_owner())
+        self.asteroid_manager.remove_asteroid(self.get_owner())
 
 
 class ExplosionManager(LogicComponent):
-    
-    def create_explosion_at(self, params):
-        explosion_gm = self.get_owner().get_application().add_game_object()
-        explosion_gm.add_component(ExplosionScript)
-        animated_sprite = explosion_gm.add_component(AnimatedSprite)
-        animated_sprite.set_sprite_sequence(self.get_owner().get_application().get_img_loader().get_sprite_sequence('explosion'))
-        explosion_gm.get_transform().position = params['position']
-    
-    def on_component_creation(self):   
-        evt_sys = self.get_owner().get_application().get_event_system()
-        evt_sys.register_event_callback('CometExplosion',self.create_explosion_at)
 
-class ExplosionScript(LogicComponent):
-    
     """
-    Esta classe remove a explosão depois de 240 frames
+    Esta classe cria as explosões dos asteroides, reaproveitadas por um GameObjectPool
+    e devolvidas a ele depois de EXPLOSION_LIFETIME frames
     """
 
     def __init__(self):
         super().__init__()
-        self.__death_time = time.time() + 4.2
+        self.__pool = None
 
-    def on_component_creation(self):
-        self.get_owner().get_application().enqueue_method(self.delete, 240)
+    def build_explosion(self, explosion_gm: GameObject):
+        """
+        Adiciona a animação de explosão a um GameObject novo
+        """
+        animated_sprite = explosion_gm.add_component(AnimatedSprite)
+        sprite_sequence = self.get_owner().get_application().get_img_loader().get_sprite_sequence('explosion')
+        animated_sprite.set_sprite_sequence(sprite_sequence, 'explosion')
+        animated_sprite.set_frame_duration(EXPLOSION_DURATION/len(sprite_sequence))
 
-    def delete(self):
+    def reset_explosion(self, explosion_gm: GameObject, position: Vector2):
         """
-        Remove o objeto do jogo
+        Posiciona uma explosão obtida do pool e agenda a sua devolução
         """
-        self.get_owner().get_application().remove_game_object(self.get_owner())
\ No newline at end of file
+        explosion_gm.get_transform().position = Vector2(position)
+        self.__pool.release_after(explosion_gm, EXPLOSION_LIFETIME)
+
+    def create_explosion_at(self, params):
+        self.__pool.acquire(params['position'])
+    
+    def on_component_creation(self):   
+        self.__pool = GameObjectPool(self.get_owner().get_application(), self.build_explosion, self.reset_explosion)
+        evt_sys = self.get_owner().get_application().get_event_system()
+        evt_sys.register_event_callback('CometExplosion',self.create_explosion_at)
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""
+Esse módulo contem as camadas de colisão utilizadas pelos objetos do jogo
+"""
+
+SHIP_LAYER = 1 << 0
+ASTEROID_LAYER = 1 << 1
+BULLET_LAYER = 1 << 2
+
+SHIP_MASK = ASTEROID_LAYER
+ASTEROID_MASK = SHIP_LAYER | ASTEROID_LAYER | BULLET_LAYER
+BULLET_MASK = ASTEROID_LAYER
@@ -9,6 +9,7 @@ from engine.core.objects import SpriteRenderer, ShipController, BackgroundRender
 from engine.game.weapon import Weapon, BulletFactory
 from engine.core.physics import RectCollider
 from engine.core.utilities import scaled_number, scale_number_with_meter
+from engine.game.collision_layers import SHIP_LAYER, SHIP_MASK
 
 class GameManager(LogicComponent):
 
@@ -81,6 +82,7 @@ class GameManager(LogicComponent):
         background_renderer.set_new_sprite('starfield')
         score = self.__app.add_game_object()
         text_renderer = score.add_component(TextRenderer)
+        text_renderer.set_glyph_cache(True)
         text_renderer.set_text("0")
         score.get_transform().position = Vector2(self.__screen_width/2, 32)
         score.add_component(ScoreListener)
@@ -139,7 +141,9 @@ class GameManager(LogicComponent):
         ship.set_sorting_layer_index(1)
         dimensions = spr.get_dimensions()
         spr.set_sprite_scale_in_meters(2)
-        ship.add_component(RectCollider)
+        ship_collider = ship.add_component(RectCollider)
+        ship_collider.collision_layer = SHIP_LAYER
+        ship_collider.collision_mask = SHIP_MASK
         ship.add_component(BulletFactory)
         ship.add_component(Weapon)
         rb = ship.add_component(Rigidbody)
@@ -4,38 +4,69 @@ from typing import Tuple
 from pygame.math import Vector2
 from engine.core.objects import LogicComponent, GameObject, Rigidbody, CircleRenderer, RenderComponent
 from engine.core.physics import Collider, CircleCollider
+from engine.core.pool import GameObjectPool
 from engine.game.asteroid import AsteroidScript
+from engine.game.collision_layers import BULLET_LAYER, BULLET_MASK
 from engine.core.utilities import scale_number_with_meter, scaled_number
 
+#Número de frames lógicos que um projétil permanece no jogo
+BULLET_LIFETIME = 250
+
 
 class BulletFactory(LogicComponent):
     """
-    Esta classe é responsavel por criar GameObjects que se comportam como projéteis
+    Esta classe é responsavel por criar GameObjects que se comportam como projéteis.
+    Os projéteis são reaproveitados por um GameObjectPool
     """
     def __init__(self):
         super().__init__()
         self.__app = None
+        self.__pool = None
 
     def on_component_creation(self):
         self.__app = self.get_owner().get_application()
+        self.__pool = GameObjectPool(self.__app, self.build_bullet, self.reset_bullet)
 
-    def get_new_object(self, radius_in_meters: float, initial_velocity: Vector2, initial_position: Vector2,color: Tuple[int, int, int] = (0, 255, 0)) -> GameObject:
+    def on_component_removal(self):
+        #Cada nave possui o seu pool, então os projéteis são removidos junto com ela
+        self.__pool.clear()
+
+    def get_pool(self) -> GameObjectPool:
         """
-        Retorna um novo projétil
+        Retorna o pool de projéteis
         """
+        return self.__pool
 
-        bullet = self.__app.add_game_object()
-        bullet.get_transform().position = initial_position
+    def build_bullet(self, bullet: GameObject):
+        """
+        Adiciona os componentes de um projétil a um GameObject novo
+        """
         rb = bullet.add_component(Rigidbody)
         rb.mass = 0.000001
-        rb.velocity = initial_velocity
-        cr = bullet.add_component(CircleRenderer)
+        bullet.add_component(CircleRenderer)
+        cc = bullet.add_component(CircleCollider)
+        cc.collision_layer = BULLET_LAYER
+        cc.collision_mask = BULLET_MASK
+        cc.continuous_collision = True
+        bullet.add_component(BulletScript).set_pool(self.__pool)
+
+    def reset_bullet(self, bullet: GameObject, radius_in_meters: float, initial_velocity: Vector2, initial_position: Vector2, color: Tuple[int, int, int]):
+        """
+        Reinicia o estado de um projétil obtido do pool
+        """
+        bullet.get_transform().position = initial_position
+        bullet.get_component(Rigidbody).velocity = initial_velocity
+        cr = bullet.get_component(CircleRenderer)
         cr.set_radius(int(scale_number_with_meter(radius_in_meters)))
         cr.set_color(color)
-        cc = bullet.add_component(CircleCollider)
-        cc.radius = scale_number_with_meter(radius_in_meters)
-        bullet.add_component(BulletScript)
-        return bullet
+        bullet.get_component(CircleCollider).radius = scale_number_with_meter(radius_in_meters)
+        self.__pool.release_after(bullet, BULLET_LIFETIME)
+
+    def get_new_object(self, radius_in_meters: float, initial_velocity: Vector2, initial_position: Vector2,color: Tuple[int, int, int] = (0, 255, 0)) -> GameObject:
+        """
+        Retorna um novo projétil
+        """
+        return self.__pool.acquire(radius_in_meters, initial_velocity, initial_position, color)
 
 class BulletScript(LogicComponent):
     """
@@ -44,29 +75,28 @@ class BulletScript(LogicComponent):
 
     def __init__(self):
         super().__init__()
-        self.__physic_system = None
+        self.__pool = None
 
-    def on_component_creation(self):
-        self.__physic_system = self.get_owner().get_application().get_physic_manager()
-        self.get_owner().get_application().enqueue_method(self.delete, 250)
+    def set_pool(self, pool: GameObjectPool):
+        """
+        Define o pool para o qual o projétil é devolvido
+        """
+        self.__pool = pool
 
     def delete(self):
         """
-        Remove o objeto do jogo
+        Devolve o projétil ao pool
         """
-        self.get_owner().get_application().remove_game_object(self.get_owner())
+        self.__pool.release(self.get_owner())
 
-    def on_collision_enter(self, other: Collider, contact_point: Vector2, relative_velocity: float):
-        evt_sys = self.get_owner().get_application().get_event_system()
+    def on_collision_enter(self, other: Collider, contact_point: Vector2, normal: Vector2):
+        #As colisões são processadas enquanto os colisores são percorridos,
+        #então a explosão e a remoção são aplicadas no ponto de sincronização após a física
+        command_buffer = self.get_owner().get_application().get_command_buffer()
         asteroid_script = other.get_owner().get_component(AsteroidScript)
         if asteroid_script is not None:
-            asteroid_script.explode()
-            evt_sys.register_event_callback_one_shot("LogicFrameStart", lambda params: asteroid_script.explode())
-        evt_sys.register_event_callback_one_shot("LogicFrameStart", self.self_destroy)
-
-    def self_destroy(self, callback_params):
-        self.__physic_system.remove_collider(self.get_owner().get_component(CircleCollider))
-        self.get_owner().get_application().remove_game_object(self.get_owner())
+            command_buffer.call(asteroid_script.explode)
+        command_buffer.call(self.delete)
 
 
 class Weapon(LogicComponent):
@@ -9,12 +9,13 @@ from engine.core.objects import CircleRenderer,Rigidbody,ShipController,SpriteRe
 from engine.core.objects import AnimatedSprite, BackgroundRenderer, TextRenderer, Button
 import engine
 from engine.core.physics import RectCollider
-from engine.game.asteroid import AsteroidManagerScript, ExplosionManager
+from engine.game.asteroid import AsteroidManagerScript, ExplosionManager, EXPLOSION_FRAME_COUNT
 from engine.game.game_logic import GameManager, ScoreListener
 from engine.game.weapon import Weapon, BulletFactory
 import os
 app = Application()
 engine.core.utilities.application_reference = app
+app.get_img_loader().set_decoded_image_cache(os.path.join(os.getcwd(), '.asset_cache'))
 app.get_img_loader().load_new_image('AI_SHIP.png','ship')
 app.get_img_loader().load_new_image('F5S2.png', 'ship_2')
 app.get_img_loader().load_new_image('asteroid.png', 'asteroid')
@@ -29,10 +30,8 @@ app.get_sound_manager().load_new_sound('pause_sound.wav', 'pause')
 screen_width = app.get_display().get_width()
 screen_height = app.get_display().get_height()
 
-app.get_img_loader().create_sprite_sequence('explosion')
-for i in range(254):
-    index = "{:04d}".format(i)
-    app.get_img_loader().load_image_to_sprite_sequence('explosion/explosion'+index+".png", 'explosion')
+explosion_frames = app.get_img_loader().find_images('explosion/explosion*.png')
+app.get_img_loader().load_baked_sprite_sequence(explosion_frames, 'explosion', frame_count=EXPLOSION_FRAME_COUNT)
 
 
 meter = app.get_meter()
@@ -0,0 +1,34 @@
+"""
+Testes da normal de contato entre retangulos orientados e circulos
+"""
+
+import math
+import random
+import unittest
+from engine.core.utilities import oriented_box_circle_intersection
+
+
+class ContactNormalTest(unittest.TestCase):
+
+    def test_normal_is_unit_length(self):
+        generator = random.Random(7)
+        contacts = 0
+        for _ in range(2000):
+            angle = generator.uniform(0, 2*math.pi)
+            right_x, right_y = math.cos(angle), math.sin(angle)
+            contact = oriented_box_circle_intersection(0.0, 0.0, right_x, right_y, -right_y, right_x,
+            generator.uniform(1, 20), generator.uniform(1, 20),
+            generator.uniform(-30, 30), generator.uniform(-30, 30), generator.uniform(1, 15))
+            if contact is None:
+                continue
+            contacts += 1
+            self.assertAlmostEqual(math.hypot(contact[2], contact[3]), 1.0, places=9)
+        self.assertGreater(contacts, 0)
+
+    def test_normal_points_from_box_to_circle(self):
+        contact = oriented_box_circle_intersection(0.0, 0.0, 1.0, 0.0, 0.0, 1.0, 5.0, 5.0, 8.0, 0.0, 4.0)
+        self.assertEqual(contact, (5.0, 0.0, 1.0, 0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
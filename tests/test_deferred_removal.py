@@ -0,0 +1,80 @@
+"""
+Testes da remoção de objetos durante o passo de física
+"""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import unittest
+from pygame.math import Vector2
+from engine.core.application import Application
+from engine.core.objects import LogicComponent, Rigidbody
+from engine.core.physics import CircleCollider
+from engine.core.pool import GameObjectPool
+
+
+class CollisionCounter(LogicComponent):
+
+    """
+    Conta as colisões recebidas e executa on_hit na primeira delas
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.hits = 0
+        self.on_hit = None
+
+    def on_collision_enter(self, other, contact_point, normal):
+        self.hits += 1
+        if self.hits == 1 and self.on_hit is not None:
+            self.on_hit(self.get_owner())
+
+
+def add_circle(game_object, position):
+    game_object.get_transform().position = Vector2(position)
+    game_object.add_component(Rigidbody)
+    collider = game_object.add_component(CircleCollider)
+    collider.radius = 10
+    return game_object.add_component(CollisionCounter)
+
+
+class DeferredRemovalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Application()
+
+    def step(self):
+        self.app._Application__logic_step()
+
+    def add_touching_pair(self):
+        """
+        Cria um circulo que toca outros dois circulos no mesmo passo e retorna os contadores
+        """
+        counters = list()
+        for position in ((0, 0), (15, 0), (-15, 0)):
+            counters.append(add_circle(self.app.add_game_object(), position))
+        return counters
+
+    def test_removed_object_stops_colliding_in_the_same_step(self):
+        center, right, left = self.add_touching_pair()
+        center.on_hit = self.app.remove_game_object
+        self.step()
+        self.assertEqual(center.hits, 1)
+        self.assertEqual(right.hits + left.hits, 1)
+        self.assertIsNone(self.app.get_game_object_by_id(center.get_owner().get_id()))
+
+    def test_released_object_stops_colliding_in_the_same_step(self):
+        pool = GameObjectPool(self.app, lambda game_object: add_circle(game_object, (0, 0)))
+        center = pool.acquire().get_component(CollisionCounter)
+        right = add_circle(self.app.add_game_object(), (15, 0))
+        left = add_circle(self.app.add_game_object(), (-15, 0))
+        center.on_hit = pool.release
+        self.step()
+        self.assertEqual(center.hits, 1)
+        self.assertEqual(right.hits + left.hits, 1)
+        self.assertEqual(pool.get_free_count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()